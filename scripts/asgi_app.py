@@ -0,0 +1,266 @@
+"""
+Asyncio (ASGI) serving entry point for the MNIST REST API.
+
+Provides the same /predict, /health and upload routes as flask_app, but
+every request is a coroutine: image decoding runs on a thread pool,
+inference is awaited on the micro-batching engine's dedicated thread and
+database writes go through an asyncpg pool. A slow database therefore
+suspends requests instead of tying up worker threads, and a small number
+of processes can hold thousands of requests in flight.
+
+Usage:
+    uvicorn asgi_app:app --host 0.0.0.0 --port 5000 [--workers 2]
+"""
+import asyncio
+import logging
+import time
+
+import numpy as np
+from quart import Quart, Response, g, request, jsonify, render_template, redirect
+
+from src.async_db_helper import create_async_pool, insert_input_and_prediction
+from src.batching import BatchingPredictor, MAX_BATCH_SIZE, MAX_BATCH_WAIT_MS
+from src.model_registry import RegistryWatcher, get_active_version
+from src.preprocessing import decode_base64, preprocess_image
+from src.metrics import CACHE_LOOKUPS, observe_request, render_metrics, stage_timer
+from src.prediction_cache import create_prediction_cache, image_hash
+
+from flask_app import (
+    DB_DEDUPE_INPUTS,
+    MODEL_POLL_INTERVAL,
+    allowed_file,
+    encode_preview_png,
+    load_model_version,
+    prepare_app,
+    startup_timings
+)
+
+app = Quart(__name__)
+logger = logging.getLogger('asgi_app')
+
+# Global batching engine, prediction cache and async database pool
+batcher = None
+prediction_cache = None
+db_pool = None
+ready = False
+
+
+async def watch_model_registry(watcher: RegistryWatcher):
+    """Hot-swap the served model whenever the registry's active version changes."""
+    while True:
+        await asyncio.sleep(MODEL_POLL_INTERVAL)
+        try:
+            version = await asyncio.to_thread(watcher.poll)
+        except Exception:
+            logger.exception("Checking the model registry failed")
+            continue
+        if version is None:
+            continue
+        try:
+            logger.info("Activating model version '%s'", version)
+            new_model, new_version = await asyncio.to_thread(load_model_version, version)
+            # In-flight batches finish on the old model
+            batcher.set_model(new_model, new_version)
+            watcher.acknowledge(new_version)
+            logger.info("Now serving model version '%s'", new_version)
+        except Exception:
+            # Retrying every poll would reload the same broken files; wait for a new version
+            watcher.reject(version)
+            logger.exception("Model hot-swap to version '%s' failed; still serving '%s' until "
+                             "the active version changes", version, watcher.current_version)
+
+
+@app.before_serving
+async def initialize_app():
+    """Set up the database, load the model and open the async pool."""
+    global batcher, prediction_cache, db_pool, ready
+
+    # Database setup and model loading are blocking one-time steps
+    await asyncio.to_thread(prepare_app, preload_model=False)
+
+    start = time.perf_counter()
+    model, model_version = await asyncio.to_thread(load_model_version, get_active_version())
+    startup_timings['model_load'] = round(time.perf_counter() - start, 4)
+    print(f"Model version '{model_version}' loaded successfully!")
+
+    batcher = BatchingPredictor(
+        model,
+        max_batch_size=MAX_BATCH_SIZE,
+        max_wait_ms=MAX_BATCH_WAIT_MS,
+        model_version=model_version
+    )
+    batcher.start()
+    prediction_cache = create_prediction_cache()
+
+    db_pool = await create_async_pool(
+        host='db',
+        database='milestone_5',
+        user='postgres',
+        password='postgres'
+    )
+
+    if MODEL_POLL_INTERVAL > 0:
+        watcher = RegistryWatcher(current_version=model_version)
+        app.add_background_task(watch_model_registry, watcher)
+
+    ready = True
+    print("ASGI REST API ready!")
+
+
+@app.after_serving
+async def shutdown_app():
+    """Stop the batching engine and close the async pool."""
+    if batcher is not None:
+        await asyncio.to_thread(batcher.stop)
+    if db_pool is not None:
+        await db_pool.close()
+
+
+async def predict_image(image_array: np.ndarray, true_label: int) -> dict:
+    """
+    Predict one decoded image and store it with its prediction.
+
+    Args:
+        image_array: Image of shape (28, 28, 1)
+        true_label: The true label of the image (-1 if unknown)
+
+    Returns:
+        dict: Prediction, confidence, probabilities, database IDs and model version
+    """
+    digest = image_hash(image_array) if prediction_cache is not None or DB_DEDUPE_INPUTS else None
+
+    prediction_probs = None
+    if prediction_cache is not None:
+        used_version = batcher.model_version
+        # The shared cache store is SQLite, which blocks
+        prediction_probs = await asyncio.to_thread(prediction_cache.get, used_version, digest)
+        CACHE_LOOKUPS.labels('miss' if prediction_probs is None else 'hit').inc()
+    if prediction_probs is None:
+        with stage_timer('inference'):
+            prediction_probs, used_version = await asyncio.wrap_future(batcher.submit(image_array))
+        if prediction_cache is not None:
+            await asyncio.to_thread(prediction_cache.put, used_version, digest, prediction_probs)
+
+    predicted_label = int(prediction_probs.argmax())
+    confidence = float(prediction_probs.max())
+
+    with stage_timer('db_insert'):
+        input_data_id, prediction_id = await insert_input_and_prediction(
+            db_pool,
+            image_array,
+            int(true_label),
+            predicted_label=predicted_label,
+            confidence=confidence,
+            prediction_probabilities=prediction_probs,
+            model_version=used_version,
+            image_hash=digest if DB_DEDUPE_INPUTS else None
+        )
+
+    return {
+        'prediction': predicted_label,
+        'confidence': confidence,
+        'probabilities': prediction_probs.tolist(),
+        'input_data_id': input_data_id,
+        'prediction_id': prediction_id,
+        'model_version': used_version
+    }
+
+
+@app.route('/predict', methods=['POST'])
+async def predict():
+    """REST endpoint for MNIST digit prediction."""
+    try:
+        with stage_timer('json_parse'):
+            data = await request.get_json(silent=True)
+
+        if not data or 'image' not in data:
+            return jsonify({'error': 'Missing "image" field in request body'}), 400
+
+        try:
+            with stage_timer('base64_decode'):
+                image_bytes = decode_base64(data['image'])
+            with stage_timer('preprocess'):
+                image_array = await asyncio.to_thread(preprocess_image, image_bytes)
+        except Exception as e:
+            return jsonify({'error': f'Failed to decode image: {str(e)}'}), 400
+
+        response = await predict_image(image_array, data.get('true_label', -1))
+        return jsonify(response), 200
+
+    except Exception as e:
+        return jsonify({'error': f'Prediction failed: {str(e)}'}), 500
+
+
+@app.before_request
+async def start_request_timer():
+    """Remember when the request started."""
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+async def record_request_metrics(response):
+    """Count the request and record its latency."""
+    observe_request(
+        request.endpoint or 'unknown',
+        response.status_code,
+        time.perf_counter() - g.request_start
+    )
+    return response
+
+
+@app.route('/metrics', methods=['GET'])
+async def metrics():
+    """Prometheus metrics: request counts, errors, stage latencies, batch sizes, queue depths."""
+    payload, content_type = render_metrics()
+    return Response(payload, content_type=content_type)
+
+
+@app.route('/health', methods=['GET'])
+async def health():
+    """Health check endpoint."""
+    if not ready:
+        return jsonify({'status': 'starting'}), 503
+    response = {'status': 'healthy', 'model_version': batcher.model_version}
+    if prediction_cache is not None:
+        response['prediction_cache'] = prediction_cache.stats()
+    return jsonify(response), 200
+
+
+# --- FRONT-END ROUTES ---
+
+@app.route("/", methods=["GET"])
+async def index():
+    """Render the upload page."""
+    return await render_template("upload.html")
+
+
+@app.route("/upload", methods=["POST"])
+async def upload_file():
+    """Handle uploaded images from the front-end."""
+    files = await request.files
+    if "image" not in files:
+        return redirect(request.url)
+
+    file = files["image"]
+
+    if file.filename == "" or not allowed_file(file.filename):
+        return redirect(request.url)
+
+    try:
+        with stage_timer('preprocess'):
+            image_array = await asyncio.to_thread(preprocess_image, file.read())
+        result = await predict_image(image_array, -1)
+        image_data = encode_preview_png(image_array)
+        prediction = result['prediction']
+        confidence = result['confidence']
+    except Exception:
+        prediction = "Error"
+        confidence = None
+        image_data = None
+
+    return await render_template(
+        "upload.html",
+        prediction=prediction,
+        confidence=confidence,
+        image_data=image_data
+    )
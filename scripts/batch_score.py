@@ -0,0 +1,176 @@
+"""
+Offline batch re-scoring of all stored inputs.
+
+This script re-scores every row of the input_data table with a (new) model
+and writes a new set of predictions tagged with the model version:
+1. Streaming inputs from PostgreSQL in batches (server-side cursor)
+2. Prefetching the next batches in a reader thread while the model runs
+3. Running one batched forward pass per batch
+4. Bulk-writing the predictions in a writer thread
+
+Predictions are committed batch by batch. A run started again with the
+same model version only scores the inputs that have no prediction from
+that version yet, so an interrupted run resumes where it stopped. Gaps
+left by other writers are handled too, e.g. live predictions the service
+tagged with the same version.
+
+Usage:
+    python batch_score.py [--model-path /app/models/mnist_model.keras]
+                          [--model-version v2] [--batch-size 1024]
+"""
+import argparse
+import queue
+import threading
+import time
+
+from src.model_io import load_model
+from src.model_registry import default_model_version
+from src.db_helper import (
+    get_connection,
+    create_tables,
+    iter_input_data,
+    insert_predictions_batch
+)
+
+# Marks the end of a stream between pipeline stages
+_END = object()
+
+
+def parse_args():
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(description="Re-score all stored inputs with a model")
+    parser.add_argument('--host', default='db', help="Database host")
+    parser.add_argument('--database', default='milestone_5', help="Database name")
+    parser.add_argument('--user', default='postgres', help="Database user")
+    parser.add_argument('--password', default='postgres', help="Database password")
+    parser.add_argument('--model-path', default='/app/models/mnist_model.keras',
+                        help="Model file to score with")
+    parser.add_argument('--model-version', default=None,
+                        help="Version tag for the predictions (default: file name and checksum)")
+    parser.add_argument('--batch-size', type=int, default=1024,
+                        help="Rows per database fetch and forward pass")
+    parser.add_argument('--prefetch', type=int, default=4,
+                        help="Number of batches read ahead of the model")
+    parser.add_argument('--no-resume', action='store_true',
+                        help="Score all inputs even if this model version already scored some")
+    return parser.parse_args()
+
+
+def _reader(conn, unscored_by, batch_size, batches, stop, errors):
+    """Stream input batches from the database into the prefetch queue."""
+    try:
+        for batch in iter_input_data(conn, fetch_size=batch_size, unscored_by=unscored_by):
+            if stop.is_set():
+                break
+            batches.put(batch)
+    except Exception as e:
+        errors.append(e)
+    finally:
+        batches.put(_END)
+
+
+def _writer(conn, model_version, results, stop, errors):
+    """Bulk-write scored batches from the results queue; a failed write stops the run."""
+    try:
+        while True:
+            item = results.get()
+            if item is _END:
+                break
+            ids, probs = item
+            insert_predictions_batch(conn, ids.tolist(), probs, model_version=model_version)
+    except Exception as e:
+        errors.append(e)
+        # Abort the reader and the scoring loop instead of scoring the rest of the table
+        stop.set()
+        # Keep draining so the scoring loop never blocks on a full queue
+        while results.get() is not _END:
+            pass
+
+
+def main():
+    """Re-score all inputs and report the throughput."""
+    args = parse_args()
+
+    print("=" * 60)
+    print("Batch Re-Scoring of Stored Inputs")
+    print("=" * 60)
+
+    print("\n[Step 1/3] Loading model...")
+    model = load_model(args.model_path)
+    model_version = args.model_version or default_model_version(args.model_path)
+    print(f"Model version: {model_version}")
+
+    print("\n[Step 2/3] Connecting to database...")
+    conn_kwargs = dict(
+        host=args.host,
+        database=args.database,
+        user=args.user,
+        password=args.password
+    )
+    # Separate connections: committing on the reader's connection would
+    # close its server-side cursor
+    read_conn = get_connection(**conn_kwargs)
+    write_conn = get_connection(**conn_kwargs)
+    create_tables(write_conn)
+
+    # Resume by skipping every input this model version has already scored
+    unscored_by = None if args.no_resume else model_version
+
+    print("\n[Step 3/3] Scoring...")
+    batches = queue.Queue(maxsize=args.prefetch)
+    results = queue.Queue(maxsize=args.prefetch)
+    stop = threading.Event()
+    errors = []
+    reader = threading.Thread(
+        target=_reader,
+        args=(read_conn, unscored_by, args.batch_size, batches, stop, errors),
+        daemon=True
+    )
+    writer = threading.Thread(
+        target=_writer,
+        args=(write_conn, model_version, results, stop, errors),
+        daemon=True
+    )
+    reader.start()
+    writer.start()
+
+    scored = 0
+    reader_done = False
+    start_time = time.perf_counter()
+    try:
+        while not stop.is_set():
+            batch = batches.get()
+            if batch is _END:
+                reader_done = True
+                break
+            ids, images, _ = batch
+            probs = model.predict(images, batch_size=len(images), verbose=0)
+            results.put((ids, probs))
+
+            scored += len(ids)
+            elapsed = time.perf_counter() - start_time
+            print(f"Scored {scored} inputs (last id {ids[-1]}, "
+                  f"{scored / max(elapsed, 1e-9):.0f} inputs/s)")
+    finally:
+        results.put(_END)
+        writer.join()
+        # Unblock the reader if scoring stopped early
+        stop.set()
+        while not reader_done:
+            reader_done = batches.get() is _END
+        reader.join()
+        read_conn.close()
+        write_conn.close()
+
+    if errors:
+        raise errors[0]
+
+    elapsed = time.perf_counter() - start_time
+    print("\n" + "=" * 60)
+    print(f"Scored {scored} inputs with model '{model_version}' in {elapsed:.2f}s "
+          f"({scored / max(elapsed, 1e-9):.0f} inputs/s)")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
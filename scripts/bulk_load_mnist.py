@@ -0,0 +1,99 @@
+"""
+Bulk loader for the MNIST dataset.
+
+This script streams the complete MNIST dataset (70k images) into the
+input_data table using PostgreSQL's binary COPY protocol:
+1. Initializing the PostgreSQL database and tables
+2. Loading the MNIST dataset
+3. Copying the train and test splits in chunks, committing after each chunk
+
+An interrupted load resumes after the last committed chunk when the
+script is run again.
+
+Usage:
+    python bulk_load_mnist.py [--host db] [--database milestone_3]
+                              [--chunk-size 10000] [--split all] [--no-resume]
+"""
+import argparse
+import time
+
+from src.load_data import load_mnist_data
+from src.db_helper import (
+    create_database,
+    create_tables,
+    get_connection,
+    bulk_load_input_data
+)
+
+
+def parse_args():
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(description="Bulk-load MNIST into input_data")
+    parser.add_argument('--host', default='db', help="Database host")
+    parser.add_argument('--database', default='milestone_3', help="Database name")
+    parser.add_argument('--user', default='postgres', help="Database user")
+    parser.add_argument('--password', default='postgres', help="Database password")
+    parser.add_argument('--chunk-size', type=int, default=10000,
+                        help="Rows per COPY and commit")
+    parser.add_argument('--split', choices=['train', 'test', 'all'], default='all',
+                        help="Which MNIST split to load")
+    parser.add_argument('--no-resume', action='store_true',
+                        help="Load from the beginning even if a previous load was interrupted")
+    return parser.parse_args()
+
+
+def main():
+    """Load the MNIST dataset into the database."""
+    args = parse_args()
+
+    print("=" * 60)
+    print("MNIST Bulk Loader")
+    print("=" * 60)
+
+    print("\n[Step 1/3] Initializing database...")
+    conn_params = {
+        'host': args.host,
+        'user': args.user,
+        'password': args.password
+    }
+    create_database(conn_params, args.database)
+    conn = get_connection(
+        host=args.host,
+        database=args.database,
+        user=args.user,
+        password=args.password
+    )
+    create_tables(conn)
+
+    print("\n[Step 2/3] Loading MNIST dataset...")
+    (x_train, y_train), (x_test, y_test) = load_mnist_data(sparse_labels=True)
+    splits = []
+    if args.split in ('train', 'all'):
+        splits.append(('mnist_train', x_train, y_train))
+    if args.split in ('test', 'all'):
+        splits.append(('mnist_test', x_test, y_test))
+
+    print("\n[Step 3/3] Copying images into input_data...")
+    start_time = time.perf_counter()
+    total_loaded = 0
+    for source, images, labels in splits:
+        total_loaded += bulk_load_input_data(
+            conn,
+            images,
+            labels,
+            source=source,
+            chunk_size=args.chunk_size,
+            resume=not args.no_resume
+        )
+    elapsed = time.perf_counter() - start_time
+
+    conn.close()
+
+    print("\n" + "=" * 60)
+    print(f"Loaded {total_loaded} rows in {elapsed:.2f}s "
+          f"({total_loaded / max(elapsed, 1e-9):.0f} rows/s)")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,29 +11,94 @@ This script provides a REST API endpoint for MNIST digit prediction:
 Additionally, this version includes a front-end upload page at /
 with a form to upload images for prediction.
 """
+import os
 import time
+import atexit
+import logging
 import base64
 import io
+import threading
+from contextlib import contextmanager
 import numpy as np
-from flask import Flask, request, jsonify, render_template, redirect, url_for
+from flask import Flask, Response, g, request, jsonify, render_template, redirect, url_for
 from PIL import Image
 from werkzeug.utils import secure_filename
-import requests
 
-from src.model_io import load_model
+from src.predict import load_backend, warm_up, configure_threads, BACKENDS, INFERENCE_BACKEND
+from src.batching import BatchingPredictor, MAX_BATCH_SIZE, MAX_BATCH_WAIT_MS
+from src.model_registry import (
+    RegistryWatcher,
+    get_active_version,
+    get_model_path,
+    default_model_version
+)
+from src.write_behind import WriteBehindQueue
+from src.prediction_service import PredictionService
+from src.prediction_cache import create_prediction_cache
+from src.preprocessing import decode_base64, preprocess_image, preprocess_images
+from src.metrics import observe_request, render_metrics, stage_timer
 from src.db_helper import (
     create_database,
     create_tables,
-    get_connection,
-    insert_input_data,
-    insert_prediction
+    create_pool,
+    get_connection
 )
 
 app = Flask(__name__)
 
-# Global variables for model and database connection
+# Request-path logging is gated by level (set LOG_LEVEL=DEBUG to log every prediction)
+logging.basicConfig(
+    level=os.getenv('LOG_LEVEL', 'INFO').upper(),
+    format='%(asctime)s %(levelname)s %(name)s %(message)s'
+)
+logger = logging.getLogger('flask_app')
+
+# Global variables for model, batching engine, database connection pool
+# and the prediction service shared by all endpoints
 model = None
-db_conn = None
+model_version = None
+batcher = None
+db_pool = None
+write_queue = None
+prediction_service = None
+
+# 'sync' commits before responding, 'async' persists through the write-behind queue
+DB_WRITE_MODE = os.getenv('DB_WRITE_MODE', 'sync').lower()
+
+# Store identical images only once in input_data (rows are matched by content hash)
+DB_DEDUPE_INPUTS = os.getenv('DB_DEDUPE_INPUTS', '0').lower() in ('1', 'true', 'yes')
+
+# Batch sizes run through the model at startup (defaults to powers of two up to MAX_BATCH_SIZE)
+WARMUP_BATCH_SIZES = [
+    int(size) for size in os.getenv('WARMUP_BATCH_SIZES', '').split(',') if size.strip()
+] or sorted({MAX_BATCH_SIZE} | {2 ** i for i in range(MAX_BATCH_SIZE.bit_length())})
+
+# Startup state reported by /health and /startup
+ready = False
+startup_timings = {}
+
+# Model file for each inference backend
+MODEL_PATHS = {
+    'keras': os.getenv('MODEL_PATH', '/app/models/mnist_model.keras'),
+    'tflite': os.getenv('TFLITE_MODEL_PATH', '/app/models/mnist_model.tflite'),
+    # The NumPy engine reads .keras archives directly (or .npz exports)
+    'numpy': os.getenv('NUMPY_MODEL_PATH', os.getenv('MODEL_PATH', '/app/models/mnist_model.keras'))
+}
+
+# Fail at startup, before MODEL_PATHS is indexed with an unknown backend
+if INFERENCE_BACKEND not in BACKENDS:
+    raise ValueError(
+        f"Unsupported inference backend: {INFERENCE_BACKEND} "
+        f"(INFERENCE_BACKEND must be one of {', '.join(sorted(BACKENDS))})"
+    )
+
+# Seconds between checks of the model registry's active pointer (0 disables hot-swap)
+MODEL_POLL_INTERVAL = float(os.getenv('MODEL_POLL_INTERVAL', '10'))
+
+# Backends whose loaded model can be inherited by forked worker processes.
+# TensorFlow and the TFLite interpreter start runtime threads that do not
+# survive a fork, so those backends load the model in each worker instead.
+FORK_SAFE_BACKENDS = {'numpy'}
 
 # Allowed file types for upload
 ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "gif", "bmp"}
@@ -70,125 +135,357 @@ def wait_for_db(max_retries: int = 30, retry_delay: int = 2):
     raise Exception("Database did not become ready in time")
 
 
-def initialize_app():
-    """Initialize the Flask application with model and database."""
-    global model, db_conn
+@contextmanager
+def startup_phase(name: str):
+    """Record the wall-clock duration of a startup phase."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        startup_timings[name] = round(time.perf_counter() - start, 4)
+
+
+def load_model_version(version=None):
+    """
+    Load and warm up a model from the registry, or the configured file.
+
+    Args:
+        version: Registry version to load. If None, uses MODEL_PATHS
+
+    Returns:
+        tuple: (warmed-up model, model version)
+    """
+    if version is None:
+        path = MODEL_PATHS[INFERENCE_BACKEND]
+        version = default_model_version(path)
+    else:
+        path = get_model_path(version, INFERENCE_BACKEND)
+
+    loaded = load_backend(path, INFERENCE_BACKEND)
+    warm_up(loaded, WARMUP_BATCH_SIZES)
+    return loaded, version
+
+
+def watch_model_registry(watcher: RegistryWatcher):
+    """Hot-swap the served model whenever the registry's active version changes."""
+    global model, model_version
+
+    while True:
+        time.sleep(MODEL_POLL_INTERVAL)
+        try:
+            version = watcher.poll()
+        except Exception:
+            logger.exception("Checking the model registry failed")
+            continue
+        if version is None:
+            continue
+        try:
+            logger.info("Activating model version '%s'", version)
+            new_model, new_version = load_model_version(version)
+            # In-flight batches finish on the old model
+            batcher.set_model(new_model, new_version)
+            model, model_version = new_model, new_version
+            watcher.acknowledge(new_version)
+            logger.info("Now serving model version '%s'", new_version)
+        except Exception:
+            # Retrying every poll would reload the same broken files; wait for a new version
+            watcher.reject(version)
+            logger.exception("Model hot-swap to version '%s' failed; still serving '%s' until "
+                             "the active version changes", version, model_version)
 
+
+def prepare_app(preload_model=True):
+    """
+    Run the one-time startup steps: database setup and, optionally, model load.
+
+    Under a pre-fork server this runs once in the master process, before any
+    worker is forked. It leaves no open database connections or threads
+    behind, since neither survives a fork.
+
+    Args:
+        preload_model: Whether to load the model now, so that forked workers
+            inherit it copy-on-write instead of loading their own copy
+    """
     print("=" * 60)
     print("MILESTONE 5 - Flask REST API Application")
     print("=" * 60)
 
     # Wait for database to be ready
-    print("\n[Step 1/4] Waiting for database to be ready...")
-    wait_for_db()
+    print("\n[Step 1/5] Waiting for database to be ready...")
+    with startup_phase('db_wait'):
+        wait_for_db()
 
     # Initialize database
-    print("\n[Step 2/4] Initializing database...")
+    print("\n[Step 2/5] Initializing database...")
     conn_params = {
         'host': 'db',
         'user': 'postgres',
         'password': 'postgres'
     }
-    create_database(conn_params, 'milestone_5')
+    with startup_phase('db_init'):
+        create_database(conn_params, 'milestone_5')
 
     # Create tables
-    print("\n[Step 3/4] Creating tables...")
-    db_conn = get_connection(
-        host='db',
-        database='milestone_5',
-        user='postgres',
-        password='postgres'
-    )
-    create_tables(db_conn)
+    print("\n[Step 3/5] Creating tables...")
+    with startup_phase('table_creation'):
+        conn = get_connection(
+            host='db',
+            database='milestone_5',
+            user='postgres',
+            password='postgres'
+        )
+        try:
+            create_tables(conn)
+        finally:
+            conn.close()
+
+    if preload_model:
+        load_active_model()
+
 
-    # Load trained model
-    print("\n[Step 4/4] Loading trained neural network model...")
+def load_active_model():
+    """Load the registry's active model version, or the configured model file."""
+    global model, model_version
+
+    print("\n[Step 4/5] Loading trained neural network model...")
     try:
-        model = load_model('/app/models/mnist_model.keras')
-        print("Model loaded successfully!")
+        with startup_phase('model_load'):
+            configure_threads()
+            model_version = get_active_version()
+            if model_version is not None:
+                model = load_backend(get_model_path(model_version, INFERENCE_BACKEND), INFERENCE_BACKEND)
+            else:
+                model = load_backend(MODEL_PATHS[INFERENCE_BACKEND], INFERENCE_BACKEND)
+                model_version = default_model_version(MODEL_PATHS[INFERENCE_BACKEND])
+        print(f"Model version '{model_version}' loaded successfully!")
     except Exception as e:
         print(f"Error loading model: {e}")
         raise
 
-    print("\n" + "=" * 60)
-    print("Flask REST API ready!")
-    print("Endpoint: POST /predict")
-    print("=" * 60)
 
-
-def decode_base64_image(base64_string: str) -> np.ndarray:
+def start_worker():
     """
-    Decode a base64-encoded image to a numpy array.
-    Numpy array of shape (28, 28, 1) normalized to [0, 1]
+    Start the per-process serving state: connection pool, batching engine,
+    write-behind queue and registry watcher.
+
+    Under a pre-fork server this runs in every worker after the fork. The
+    model is loaded here unless prepare_app() already loaded it.
     """
-    if ',' in base64_string:
-        base64_string = base64_string.split(',')[1]
+    global model, model_version, batcher, db_pool, write_queue, prediction_service, ready
 
-    image_bytes = base64.b64decode(base64_string)
-    image = Image.open(io.BytesIO(image_bytes))
+    db_pool = create_pool(
+        host='db',
+        database='milestone_5',
+        user='postgres',
+        password='postgres'
+    )
+
+    if DB_WRITE_MODE == 'async':
+        write_queue = WriteBehindQueue(db_pool)
+        write_queue.start()
+        atexit.register(write_queue.close)
+        print("Write-behind persistence enabled")
+
+    if model is None:
+        load_active_model()
+
+    # Start the micro-batching engine in front of the model
+    batcher = BatchingPredictor(
+        model,
+        max_batch_size=MAX_BATCH_SIZE,
+        max_wait_ms=MAX_BATCH_WAIT_MS,
+        model_version=model_version
+    )
+    batcher.start()
+    print(f"Batching enabled (max_batch_size={MAX_BATCH_SIZE}, "
+          f"max_wait_ms={MAX_BATCH_WAIT_MS})")
+    prediction_service = PredictionService(
+        batcher,
+        db_pool,
+        write_queue,
+        cache=create_prediction_cache(),
+        dedupe_inputs=DB_DEDUPE_INPUTS
+    )
+
+    # Warm up the model at every batch size the batching engine can produce
+    print(f"\n[Step 5/5] Warming up model (batch sizes {WARMUP_BATCH_SIZES})...")
+    with startup_phase('warm_up'):
+        warm_up(model, WARMUP_BATCH_SIZES)
+        batcher.predict(np.zeros((28, 28, 1), dtype=np.float32))
 
-    if image.mode != 'L':
-        image = image.convert('L')
+    if MODEL_POLL_INTERVAL > 0:
+        watcher = RegistryWatcher(current_version=model_version)
+        threading.Thread(
+            target=watch_model_registry,
+            args=(watcher,),
+            name='model-registry-watcher',
+            daemon=True
+        ).start()
 
-    if image.size != (28, 28):
-        image = image.resize((28, 28), Image.Resampling.LANCZOS)
+    ready = True
+    print(f"Startup timings (s): {startup_timings}")
+
+    print("\n" + "=" * 60)
+    print(f"Flask REST API ready! (pid {os.getpid()})")
+    print("Endpoints: POST /predict, POST /predict/batch")
+    print("=" * 60)
 
-    image_array = np.array(image, dtype=np.float32)
-    image_array = image_array / 255.0
-    image_array = image_array.reshape(28, 28, 1)
 
-    return image_array
+def initialize_app():
+    """Initialize the Flask application with model and database."""
+    prepare_app()
+    start_worker()
+
+
+def encode_preview_png(image_array: np.ndarray) -> str:
+    """
+    Encode a preprocessed image as a base64 PNG for display.
+    Shows the 28x28 image exactly as the model saw it
+    """
+    preview = Image.fromarray(np.rint(image_array[:, :, 0] * 255).astype(np.uint8))
+    buffer = io.BytesIO()
+    preview.save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode("utf-8")
 
 
 @app.route('/predict', methods=['POST'])
 def predict():
     """REST endpoint for MNIST digit prediction."""
-    global model, db_conn
-
     try:
-        data = request.get_json()
+        with stage_timer('json_parse'):
+            data = request.get_json()
 
         if not data or 'image' not in data:
             return jsonify({'error': 'Missing "image" field in request body'}), 400
 
         try:
-            image_array = decode_base64_image(data['image'])
+            with stage_timer('base64_decode'):
+                image_bytes = decode_base64(data['image'])
+            with stage_timer('preprocess'):
+                image_array = preprocess_image(image_bytes)
         except Exception as e:
             return jsonify({'error': f'Failed to decode image: {str(e)}'}), 400
 
-        true_label = data.get('true_label', -1)
-        input_data_id = insert_input_data(db_conn, image_array, int(true_label))
-        prediction_input = image_array.reshape(1, 28, 28, 1)
-        prediction_probs = model.predict(prediction_input, verbose=0)
-        predicted_label = int(prediction_probs[0].argmax())
-        confidence = float(prediction_probs[0].max())
-        prediction_id = insert_prediction(
-            db_conn,
-            input_data_id=input_data_id,
-            predicted_label=predicted_label,
-            confidence=confidence,
-            prediction_probabilities=prediction_probs[0]
-        )
+        response = prediction_service.predict(image_array, int(data.get('true_label', -1)))
 
-        response = {
-            'prediction': predicted_label,
-            'confidence': confidence,
-            'probabilities': prediction_probs[0].tolist(),
-            'input_data_id': input_data_id,
-            'prediction_id': prediction_id
-        }
-
-        print(f"Prediction: {predicted_label} (confidence: {confidence:.4f})")
+        logger.debug("prediction label=%d confidence=%.4f model_version=%s input_data_id=%s",
+                     response['prediction'], response['confidence'],
+                     response['model_version'], response['input_data_id'])
         return jsonify(response), 200
 
     except Exception as e:
         return jsonify({'error': f'Prediction failed: {str(e)}'}), 500
 
 
+def parse_batch_request():
+    """
+    Extract the images and true labels of a /predict/batch request.
+
+    Accepts either a JSON body (a list of items, or an object with an
+    "images" list) where each item is a base64 string or an object with
+    "image" and optional "true_label" fields, or a multipart upload with
+    one or more files under the "images" field.
+
+    Returns:
+        tuple: (image_arrays, true_labels) where image_arrays is one
+            (n, 28, 28, 1) array decoded in parallel
+    """
+    if request.files:
+        files = request.files.getlist('images')
+        if not files:
+            raise ValueError('Missing "images" files in multipart upload')
+        labels = request.form.getlist('true_label')
+        true_labels = [int(label) for label in labels] if labels else [-1] * len(files)
+        if len(true_labels) != len(files):
+            raise ValueError('Number of "true_label" fields does not match number of images')
+        with stage_timer('preprocess'):
+            return preprocess_images([file.read() for file in files]), true_labels
+
+    with stage_timer('json_parse'):
+        data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('images')
+    if not isinstance(data, list) or not data:
+        raise ValueError('Expected a non-empty JSON array of images')
+
+    image_strings = []
+    true_labels = []
+    for index, item in enumerate(data):
+        if isinstance(item, dict):
+            if 'image' not in item:
+                raise ValueError(f'Missing "image" field in item {index}')
+            image_strings.append(item['image'])
+            true_labels.append(int(item.get('true_label', -1)))
+        else:
+            image_strings.append(item)
+            true_labels.append(-1)
+
+    with stage_timer('preprocess'):
+        return preprocess_images(image_strings), true_labels
+
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    """REST endpoint for predicting many MNIST digits in one request."""
+    try:
+        try:
+            image_arrays, true_labels = parse_batch_request()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        results = prediction_service.predict_batch(image_arrays, true_labels)
+        return jsonify({'results': results}), 200
+
+    except Exception as e:
+        return jsonify({'error': f'Batch prediction failed: {str(e)}'}), 500
+
+
+@app.before_request
+def start_request_timer():
+    """Remember when the request started."""
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def record_request_metrics(response):
+    """Count the request and record its latency."""
+    observe_request(
+        request.endpoint or 'unknown',
+        response.status_code,
+        time.perf_counter() - g.request_start
+    )
+    return response
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics: request counts, errors, stage latencies, batch sizes, queue depths."""
+    payload, content_type = render_metrics()
+    return Response(payload, content_type=content_type)
+
+
 @app.route('/health', methods=['GET'])
 def health():
     """Health check endpoint."""
-    return jsonify({'status': 'healthy'}), 200
+    if not ready:
+        return jsonify({'status': 'starting'}), 503
+
+    response = {'status': 'healthy', 'model_version': batcher.model_version}
+    if prediction_service.cache is not None:
+        response['prediction_cache'] = prediction_service.cache.stats()
+    if write_queue is not None:
+        response['write_behind'] = write_queue.stats()
+    return jsonify(response), 200
+
+
+@app.route('/startup', methods=['GET'])
+def startup():
+    """Report readiness and the duration of each startup phase."""
+    return jsonify({
+        'ready': ready,
+        'phases': startup_timings,
+        'total_seconds': round(sum(startup_timings.values()), 4)
+    }), 200
 
 
 # --- FRONT-END ROUTES ---
@@ -210,36 +507,25 @@ def upload_file():
     if file.filename == "" or not allowed_file(file.filename):
         return redirect(request.url)
 
-    # Preprocess image
-    image = Image.open(file).convert("L").resize((28, 28))
-    image_array = np.array(image, dtype=np.float32) / 255.0
-    image_array = image_array.reshape(28, 28, 1)
-
-    # Convert image to base64 for /predict
-    buffer = io.BytesIO()
-    image.save(buffer, format="PNG")
-    img_str = base64.b64encode(buffer.getvalue()).decode("utf-8")
-
-    # Call /predict internally
-    response = requests.post("http://localhost:5000/predict", json={"image": img_str})
-    if response.status_code == 200:
-        data = response.json()
-        prediction = data["prediction"]
-        confidence = data.get("confidence")
-    else:
-        prediction = "Error"
-        confidence = None
-
-    image_data = img_str
+    # Preprocess once and predict in-process
+    try:
+        with stage_timer('preprocess'):
+            image_array = preprocess_image(file.read())
+        result = prediction_service.predict(image_array)
+        prediction = result["prediction"]
+        confidence = result["confidence"]
+    except Exception as e:
+        logger.warning("upload prediction failed error=%s", e)
+        return render_template("upload.html", prediction="Error")
 
     return render_template(
         "upload.html",
         prediction=prediction,
         confidence=confidence,
-        image_data=image_data
+        image_data=encode_preview_png(image_array)
     )
 
 
 if __name__ == '__main__':
     initialize_app()
-    app.run(host='0.0.0.0', port=5000, debug=False)
+    app.run(host='0.0.0.0', port=5000, debug=False, threaded=True)
@@ -0,0 +1,62 @@
+"""
+Gunicorn configuration for multi-process (pre-fork) serving of flask_app.
+
+The master process sets up the database once and, for fork-safe backends
+(numpy), loads the model before forking so every worker shares the same
+weights copy-on-write. Memory-mapped weights (an export_mmap_weights()
+directory for numpy, any .tflite file for tflite) are additionally shared
+through the page cache. Each worker then opens its own connection pool,
+batching engine and registry watcher.
+
+Usage:
+    WEB_WORKERS=4 gunicorn -c gunicorn.conf.py flask_app:app
+"""
+import os
+
+# Number of worker processes and request threads per worker
+WEB_WORKERS = int(os.getenv('WEB_WORKERS', str(os.cpu_count() or 1)))
+WEB_THREADS = int(os.getenv('WEB_THREADS', '8'))
+
+# Give every worker an equal share of the cores for its inference runtime.
+# Set before the app (and NumPy) is imported so BLAS thread pools pick it up.
+os.environ.setdefault('INTRA_OP_THREADS', str(max(1, (os.cpu_count() or 1) // WEB_WORKERS)))
+os.environ.setdefault('INTER_OP_THREADS', '1')
+for _variable in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+    os.environ.setdefault(_variable, os.environ['INTRA_OP_THREADS'])
+
+# Workers write metric samples here so /metrics can sum them across processes
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/prometheus_multiproc')
+
+bind = os.getenv('BIND', '0.0.0.0:5000')
+workers = WEB_WORKERS
+worker_class = 'gthread'
+threads = WEB_THREADS
+preload_app = True
+# Workers load and warm up the model before serving, which can take a while
+timeout = int(os.getenv('WEB_TIMEOUT', '120'))
+
+
+def on_starting(server):
+    """Start with an empty metrics directory so samples of old workers do not linger."""
+    import shutil
+    directory = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+
+
+def when_ready(server):
+    """Run the one-time startup in the master, before the workers are forked."""
+    import flask_app
+    flask_app.prepare_app(preload_model=flask_app.INFERENCE_BACKEND in flask_app.FORK_SAFE_BACKENDS)
+
+
+def post_fork(server, worker):
+    """Start the per-worker pools and threads, which do not survive a fork."""
+    import flask_app
+    flask_app.start_worker()
+
+
+def child_exit(server, worker):
+    """Drop the live gauges (queue depths) of an exited worker."""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,68 @@
+"""
+Command line interface for the file-based model registry.
+
+Running Flask services poll the registry and hot-swap to the active
+version, so activating a version rolls it out without a restart.
+
+Usage:
+    python manage_models.py list
+    python manage_models.py register models/mnist_model.keras [--version v2]
+                                     [--extra-file models/mnist_model.tflite] [--activate]
+    python manage_models.py activate v2
+"""
+import argparse
+import json
+
+from src.model_registry import (
+    register_model,
+    list_versions,
+    set_active_version,
+    get_active_version
+)
+
+
+def parse_args():
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(description="Manage the model registry")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('list', help="List registered versions")
+
+    register = subparsers.add_parser('register', help="Register a model file as a new version")
+    register.add_argument('model_path', help="Saved model file")
+    register.add_argument('--version', default=None, help="Version name (default: timestamp)")
+    register.add_argument('--extra-file', action='append', default=[],
+                          help="Additional artifact of the same model (repeatable)")
+    register.add_argument('--metrics', default=None, help="Metrics as a JSON object")
+    register.add_argument('--activate', action='store_true', help="Activate the new version")
+
+    activate = subparsers.add_parser('activate', help="Make a version the served one")
+    activate.add_argument('version', help="Version to activate")
+
+    return parser.parse_args()
+
+
+def main():
+    """Run the selected registry command."""
+    args = parse_args()
+
+    if args.command == 'list':
+        active = get_active_version()
+        for info in list_versions():
+            marker = '*' if info['version'] == active else ' '
+            print(f"{marker} {info['version']}  {info['created_at']}  "
+                  f"files={sorted(info['files'])}  metrics={info['metrics']}")
+    elif args.command == 'register':
+        register_model(
+            args.model_path,
+            version=args.version,
+            metrics=json.loads(args.metrics) if args.metrics else None,
+            extra_files=args.extra_file,
+            activate=args.activate
+        )
+    elif args.command == 'activate':
+        set_active_version(args.version)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+One-off database upgrade.
+
+Creates any missing tables and migrates rows stored in the legacy np.save
+format to the compact storage codec (see db_helper.migrate_storage). Run
+it once per deployment, before the serving processes start; concurrent
+runs wait for each other instead of migrating the same rows twice.
+
+Usage:
+    python migrate_db.py [--host db] [--database milestone_3] [--batch-size 1000]
+"""
+import argparse
+import time
+
+from src.db_helper import create_database, create_tables, get_connection, migrate_storage
+
+
+def parse_args():
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(description="Create and migrate the database tables")
+    parser.add_argument('--host', default='db', help="Database host")
+    parser.add_argument('--database', default='milestone_3', help="Database name")
+    parser.add_argument('--user', default='postgres', help="Database user")
+    parser.add_argument('--password', default='postgres', help="Database password")
+    parser.add_argument('--batch-size', type=int, default=1000,
+                        help="Rows converted per transaction")
+    return parser.parse_args()
+
+
+def main():
+    """Create the tables and migrate legacy rows."""
+    args = parse_args()
+
+    print("=" * 60)
+    print("Database Migration")
+    print("=" * 60)
+
+    conn_params = {
+        'host': args.host,
+        'user': args.user,
+        'password': args.password
+    }
+    create_database(conn_params, args.database)
+    conn = get_connection(
+        host=args.host,
+        database=args.database,
+        user=args.user,
+        password=args.password
+    )
+
+    start_time = time.perf_counter()
+    try:
+        create_tables(conn)
+        migrate_storage(conn, batch_size=args.batch_size)
+    finally:
+        conn.close()
+
+    print(f"Migration finished in {time.perf_counter() - start_time:.1f} s")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Post-training int8 quantization of a saved MNIST model.
+
+This script:
+1. Loads a trained float Keras model
+2. Calibrates an int8 TFLite model on a subset of the training data
+3. Evaluates both models on the test set
+4. Publishes the int8 model only if the accuracy drop is within the threshold
+
+Exits with status 1 if the accuracy gate fails.
+
+Usage:
+    python quantize_model.py [--model-path models/mnist_model.keras]
+                             [--output-path models/mnist_model_int8.tflite]
+                             [--max-accuracy-drop 0.01] [--calibration-size 500]
+"""
+import argparse
+import os
+import sys
+
+from src.load_data import load_mnist_data
+from src.model_io import load_model
+from src.quantize import quantize_with_accuracy_gate, print_quantization_report
+
+
+def parse_args():
+    """Parse the command line arguments."""
+    model_dir = os.getenv('MODEL_DIR', 'models')
+    parser = argparse.ArgumentParser(description="Quantize a model to int8 with an accuracy gate")
+    parser.add_argument('--model-path', default=os.path.join(model_dir, 'mnist_model.keras'),
+                        help="Float Keras model to quantize")
+    parser.add_argument('--output-path', default=os.path.join(model_dir, 'mnist_model_int8.tflite'),
+                        help="Where to publish the int8 model")
+    parser.add_argument('--max-accuracy-drop', type=float, default=0.01,
+                        help="Largest tolerated absolute accuracy loss")
+    parser.add_argument('--calibration-size', type=int, default=500,
+                        help="Number of training images used for calibration")
+    parser.add_argument('--batch-size', type=int, default=256,
+                        help="Batch size for the batched latency measurement")
+    return parser.parse_args()
+
+
+def main():
+    """Quantize the model and print the report."""
+    args = parse_args()
+
+    print("=" * 60)
+    print("Post-Training int8 Quantization")
+    print("=" * 60)
+
+    print("\n[Step 1/3] Loading float model...")
+    model = load_model(args.model_path)
+
+    print("\n[Step 2/3] Loading MNIST dataset...")
+    (x_train, _), (x_test, y_test) = load_mnist_data(sparse_labels=True)
+
+    print("\n[Step 3/3] Quantizing and evaluating...")
+    report = quantize_with_accuracy_gate(
+        model,
+        calibration_data=x_train[:args.calibration_size],
+        x_test=x_test,
+        y_test=y_test,
+        output_path=args.output_path,
+        max_accuracy_drop=args.max_accuracy_drop,
+        float_model_path=args.model_path,
+        batch_size=args.batch_size
+    )
+
+    print("\n" + "=" * 60)
+    print("QUANTIZATION REPORT")
+    print("=" * 60)
+    print_quantization_report(report)
+    print("=" * 60)
+
+    if not report['published']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
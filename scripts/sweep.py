@@ -0,0 +1,132 @@
+"""
+Local hyperparameter sweep for the MNIST model.
+
+Runs train_model() configs in parallel worker processes, each pinned to
+its own slice of the CPU cores, and appends one JSON line per finished
+trial to the results file. W&B logging is optional, so sweeps also run
+offline.
+
+Usage:
+    python sweep.py [--search grid] [--workers 4] [--results sweep_results.jsonl]
+    python sweep.py --search random --trials 16 [--seed 0] [--space space.json]
+                    [--wandb-project mnist_sweep] [--model-dir models/sweep]
+    python sweep.py --scheduler asha [--eta 3] [--min-epochs 1] [--max-epochs 5]
+                    [--search random --extra-trials 16]
+
+With --scheduler asha, trials are ranked on validation accuracy at epoch
+boundaries and the losing ones are stopped early. Their epochs go to the
+survivors (up to --max-epochs) and, for random search, to up to
+--extra-trials further configs. The run ends with the wall-clock time
+saved compared with training every config for its full epochs.
+
+A --space file maps train_model parameters to lists of values, or (random
+search only) to ranges such as {"low": 0.0001, "high": 0.1, "log": true}.
+"""
+import argparse
+import json
+import os
+
+from src.scheduler import AshaScheduler
+from src.sweep import DEFAULT_EPOCHS, Uniform, available_cpus, grid_search, random_search, run_sweep
+
+# Covers the four configs of train_and_save_wandb.py and their combinations
+GRID_SPACE = {
+    'epochs': [5],
+    'batch_size': [64, 128],
+    'optimizer': ['adam', 'sgd'],
+    'extra_layer': [False, True]
+}
+
+RANDOM_SPACE = {
+    'epochs': [5],
+    'batch_size': [32, 64, 128, 256],
+    'optimizer': ['adam', 'sgd'],
+    'learning_rate': Uniform(1e-4, 1e-1, log=True),
+    'extra_layer': [False, True],
+    'dropout_rate': Uniform(0.2, 0.6)
+}
+
+
+def load_space(path):
+    """Read a search space from a JSON file."""
+    with open(path) as f:
+        space = json.load(f)
+    return {
+        name: Uniform(**values) if isinstance(values, dict) else values
+        for name, values in space.items()
+    }
+
+
+def parse_args():
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(description="Run a parallel hyperparameter sweep")
+    parser.add_argument('--search', choices=['grid', 'random'], default='grid',
+                        help="Search strategy")
+    parser.add_argument('--trials', type=int, default=8, help="Number of random search trials")
+    parser.add_argument('--seed', type=int, default=None, help="Random search seed")
+    parser.add_argument('--space', default=None, help="Search space JSON file")
+    parser.add_argument('--workers', type=int, default=max(1, len(available_cpus()) // 2),
+                        help="Concurrent trials (default: one per two cores)")
+    parser.add_argument('--results', default='sweep_results.jsonl', help="JSONL results file")
+    parser.add_argument('--wandb-project', default=None,
+                        help="Also log each trial to this W&B project (needs WANDB_TOKEN)")
+    parser.add_argument('--model-dir', default=None, help="Save each trained model in this directory")
+    parser.add_argument('--scheduler', choices=['none', 'asha'], default='none',
+                        help="Stop losing trials early with asynchronous successive halving")
+    parser.add_argument('--eta', type=int, default=3, help="ASHA reduction factor")
+    parser.add_argument('--min-epochs', type=int, default=1, help="Epochs before the first ASHA rung")
+    parser.add_argument('--max-epochs', type=int, default=None,
+                        help="Epochs of a trial that survives every rung (default: the configs' epochs)")
+    parser.add_argument('--extra-trials', type=int, default=None,
+                        help="Random search: most extra configs to fund with pruned epochs "
+                             "(default: --trials)")
+    return parser.parse_args()
+
+
+def main():
+    """Build the configs and run the sweep."""
+    args = parse_args()
+
+    if args.wandb_project and os.getenv("WANDB_TOKEN") is None:
+        raise EnvironmentError("WANDB_TOKEN not found in environment variables.")
+
+    extra_configs = None
+    if args.search == 'grid':
+        configs = grid_search(load_space(args.space) if args.space else GRID_SPACE)
+    else:
+        space = load_space(args.space) if args.space else RANDOM_SPACE
+        extra_trials = args.trials if args.extra_trials is None else args.extra_trials
+        if args.scheduler == 'none':
+            extra_trials = 0
+        sampled = random_search(space, args.trials + extra_trials, seed=args.seed)
+        configs, extra_configs = sampled[:args.trials], iter(sampled[args.trials:])
+
+    scheduler = None
+    if args.scheduler == 'asha':
+        max_epochs = args.max_epochs or max(config.get('epochs', DEFAULT_EPOCHS) for config in configs)
+        scheduler = AshaScheduler(eta=args.eta, min_epochs=args.min_epochs, max_epochs=max_epochs)
+
+    print("=" * 60)
+    print(f"MNIST Hyperparameter Sweep ({args.search} search, {len(configs)} trials)")
+    print("=" * 60)
+
+    results = run_sweep(
+        configs,
+        num_workers=args.workers,
+        results_path=args.results,
+        wandb_project=args.wandb_project,
+        model_dir=args.model_dir,
+        scheduler=scheduler,
+        extra_configs=extra_configs
+    )
+
+    print("\n" + "=" * 60)
+    for result in results:
+        print(f"{result.get('val_accuracy') or 0.0:.4f}  {result.get('seconds', 0.0):7.1f}s  "
+              f"{result['status']:9}  {result['config']}")
+    print(f"Results appended to {args.results}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,17 @@ It will train the model and save it to the configured model directory.
 """
 import os
 from src.train_model import train_model
-from src.model_io import save_model
+from src.load_data import load_mnist_data
+from src.model_io import save_model, export_tflite, export_mmap_weights
+from src.quantize import quantize_with_accuracy_gate, print_quantization_report
+from src.model_registry import register_model
+
+# Training settings; also recorded in the registry metadata
+HYPERPARAMETERS = {
+    'epochs': 5,
+    'batch_size': 128
+}
+
 
 def main():
     """Train and save the model to the models directory."""
@@ -20,16 +30,76 @@ def main():
 
     # Train the model
     print("\nTraining model (this may take a few minutes)...")
-    model = train_model(epochs=5, batch_size=128)
+    model = train_model(**HYPERPARAMETERS)
 
     # Save the model in Keras format
     model_path = os.path.join(model_dir, 'mnist_model.keras')
     print(f"\nSaving model to {model_path}...")
     save_model(model, filepath=model_path)
 
+    # Export a lightweight TFLite model for serving without TensorFlow
+    quantization = os.getenv('TFLITE_QUANTIZATION', 'none').lower()
+    quantization = None if quantization == 'none' else quantization
+    representative_data = None
+    if quantization == 'int8':
+        print("Note: TFLITE_QUANTIZATION=int8 is deprecated and skips the accuracy check; "
+              "use QUANTIZE_INT8=1 for the accuracy-gated mnist_model_int8.tflite instead")
+        (x_train, _), _ = load_mnist_data()
+        representative_data = x_train[:500]
+    tflite_path = os.path.join(model_dir, 'mnist_model.tflite')
+    print(f"\nExporting TFLite model to {tflite_path}...")
+    export_tflite(
+        model,
+        filepath=tflite_path,
+        quantization=quantization,
+        representative_data=representative_data
+    )
+
+    # Export memory-mappable weights that multi-process NumPy serving can share
+    mmap_path = os.path.join(model_dir, 'mnist_model.weights')
+    print(f"\nExporting memory-mappable weights to {mmap_path}...")
+    export_mmap_weights(model, directory=mmap_path)
+
+    # Optional int8 model, published only if it keeps its accuracy
+    int8_path = None
+    if os.getenv('QUANTIZE_INT8', '0').lower() in ('1', 'true', 'yes'):
+        int8_path = os.path.join(model_dir, 'mnist_model_int8.tflite')
+        max_drop = float(os.getenv('MAX_ACCURACY_DROP', '0.01'))
+        print(f"\nQuantizing to int8 (max accuracy drop {max_drop})...")
+        (x_train, _), (x_test, y_test) = load_mnist_data()
+        report = quantize_with_accuracy_gate(
+            model,
+            calibration_data=x_train[:500],
+            x_test=x_test,
+            y_test=y_test,
+            output_path=int8_path,
+            max_accuracy_drop=max_drop,
+            float_model_path=model_path
+        )
+        print_quantization_report(report)
+        if not report['published']:
+            int8_path = None
+
+    # Register the artifacts as a new version and make it the served one
+    version = None
+    if os.getenv('REGISTER_MODEL', '1').lower() in ('1', 'true', 'yes'):
+        print("\nRegistering model in the model registry...")
+        version = register_model(
+            model_path,
+            metrics={'test_accuracy': model.test_accuracy},
+            metadata=dict(HYPERPARAMETERS),
+            extra_files=[path for path in (tflite_path, mmap_path, int8_path) if path],
+            activate=True
+        )
+
     print("\n" + "=" * 60)
     print("Model training complete!")
     print(f"The model has been saved to: {model_path}")
+    print(f"The TFLite model has been saved to: {tflite_path}")
+    if int8_path:
+        print(f"The int8 model has been saved to: {int8_path}")
+    if version:
+        print(f"Registered and activated model version: {version}")
     print("=" * 60)
 
 
@@ -0,0 +1,117 @@
+"""
+Asyncio database helpers for the ASGI serving path.
+
+Mirrors the write helpers of db_helper on top of an asyncpg connection
+pool, so a slow database suspends coroutines instead of blocking threads.
+"""
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .db_helper import _input_data_row, encode_probabilities
+
+# input_data insert, and the upsert that reuses a row with the same image_hash
+_INSERT_INPUT_SQL = """
+    INSERT INTO input_data
+    (image_data, true_label, image_shape, image_dims, image_dtype, image_codec)
+    VALUES ($1, $2, $3, $4::smallint[], $5, $6)
+    RETURNING id
+"""
+_UPSERT_INPUT_SQL = """
+    INSERT INTO input_data
+    (image_data, true_label, image_shape, image_dims, image_dtype, image_codec, image_hash)
+    VALUES ($1, $2, $3, $4::smallint[], $5, $6, $11)
+    ON CONFLICT (image_hash) WHERE image_hash IS NOT NULL
+    DO UPDATE SET image_hash = EXCLUDED.image_hash
+    RETURNING id
+"""
+
+# Async connection pool sizing (overridable through the environment)
+ASYNC_DB_POOL_MIN = int(os.getenv('ASYNC_DB_POOL_MIN', '2'))
+ASYNC_DB_POOL_MAX = int(os.getenv('ASYNC_DB_POOL_MAX', '10'))
+
+
+async def create_async_pool(
+    host: str = "db",
+    database: str = "milestone_3",
+    user: str = "postgres",
+    password: str = "postgres",
+    min_size: int = ASYNC_DB_POOL_MIN,
+    max_size: int = ASYNC_DB_POOL_MAX
+):
+    """
+    Create an asyncpg connection pool.
+
+    Args:
+        host: Database host
+        database: Database name
+        user: Database user
+        password: Database password
+        min_size: Number of connections opened up front
+        max_size: Maximum number of simultaneously open connections
+
+    Returns:
+        asyncpg.Pool: Pool to pass to the helpers in this module
+    """
+    import asyncpg
+
+    return await asyncpg.create_pool(
+        host=host,
+        database=database,
+        user=user,
+        password=password,
+        min_size=min_size,
+        max_size=max_size
+    )
+
+
+async def insert_input_and_prediction(
+    pool,
+    image_array: np.ndarray,
+    true_label: int,
+    predicted_label: int,
+    confidence: float,
+    prediction_probabilities: np.ndarray,
+    model_version: Optional[str] = None,
+    image_hash: Optional[bytes] = None
+) -> Tuple[int, int]:
+    """
+    Insert an image and its prediction in one statement and one transaction.
+
+    Async counterpart of db_helper.insert_input_and_prediction().
+
+    Args:
+        pool: asyncpg connection pool
+        image_array: Numpy array of the image
+        true_label: The true label of the image (-1 if unknown)
+        predicted_label: The predicted class (0-9 for MNIST)
+        confidence: Confidence score of the prediction
+        prediction_probabilities: Full probability distribution
+        model_version: Optional version of the model that made the prediction
+        image_hash: Optional content hash of the image. If given, an existing
+            input_data row with the same hash is reused
+
+    Returns:
+        tuple: (input_data_id, prediction_id)
+    """
+    input_row = _input_data_row(image_array, true_label)
+    probabilities = encode_probabilities(prediction_probabilities)
+
+    params = [*input_row, predicted_label, confidence, probabilities, model_version]
+    if image_hash is None:
+        input_sql = _INSERT_INPUT_SQL
+    else:
+        input_sql = _UPSERT_INPUT_SQL
+        params.append(image_hash)
+
+    async with pool.acquire() as conn:
+        row = await conn.fetchrow(f"""
+            WITH new_input AS ({input_sql})
+            INSERT INTO predictions
+            (input_data_id, predicted_label, confidence, prediction_probabilities, model_version)
+            SELECT id, $7, $8, $9::real[], $10 FROM new_input
+            RETURNING input_data_id, id
+        """, *params)
+
+    return row['input_data_id'], row['id']
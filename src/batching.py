@@ -0,0 +1,194 @@
+"""Dynamic micro-batching inference engine for the MNIST model."""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from .metrics import BATCH_SIZE, QUEUE_DEPTH, stage_timer
+
+# Default batching parameters (overridable through the environment)
+MAX_BATCH_SIZE = int(os.getenv('MAX_BATCH_SIZE', '32'))
+MAX_BATCH_WAIT_MS = float(os.getenv('MAX_BATCH_WAIT_MS', '5'))
+
+
+class BatchingPredictor:
+    """
+    Gather concurrent single-image requests into one batched forward pass.
+
+    Callers submit one image each through predict(). A background worker
+    thread collects pending requests until either max_batch_size images
+    are queued or max_wait_ms has elapsed since the first one arrived,
+    runs a single model.predict on the stacked batch and hands every
+    caller its own row of probabilities.
+
+    The model can be replaced at any time with set_model(); batches that
+    are already running finish on the old model, later batches use the new
+    one, so no request is dropped during a swap.
+    """
+
+    def __init__(
+        self,
+        model,
+        max_batch_size=MAX_BATCH_SIZE,
+        max_wait_ms=MAX_BATCH_WAIT_MS,
+        model_version=None
+    ):
+        """
+        Args:
+            model: The Keras model to use for predictions
+            max_batch_size (int): Maximum number of images per forward pass
+            max_wait_ms (float): Maximum time to wait for a batch to fill up
+            model_version (str): Optional version tag of the model
+        """
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size must be >= 1, got {max_batch_size}")
+
+        # (model, version) is swapped as one tuple so both always match
+        self.active = (model, model_version)
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._queue_depth = QUEUE_DEPTH.labels('batching')
+        self._thread = None
+
+    def start(self):
+        """Start the background batching thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(
+            target=self._run,
+            name='batching-predictor',
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """
+        Stop the background thread after the pending requests are served.
+
+        Args:
+            timeout: Optional number of seconds to wait for the thread to exit
+        """
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    @property
+    def model(self):
+        """The model currently used for new batches."""
+        return self.active[0]
+
+    @property
+    def model_version(self):
+        """The version tag of the model currently used for new batches."""
+        return self.active[1]
+
+    def set_model(self, model, model_version=None):
+        """
+        Atomically replace the model used for subsequent batches.
+
+        Args:
+            model: The new (already warmed-up) model
+            model_version (str): Optional version tag of the new model
+        """
+        self.active = (model, model_version)
+
+    def predict(self, image_array: np.ndarray, timeout=None) -> np.ndarray:
+        """
+        Predict class probabilities for a single image.
+
+        Args:
+            image_array: Image of shape (28, 28, 1)
+            timeout: Optional number of seconds to wait for the result
+
+        Returns:
+            np.ndarray: Probability distribution of shape (NUM_CLASSES,)
+        """
+        return self.predict_versioned(image_array, timeout)[0]
+
+    def predict_versioned(self, image_array: np.ndarray, timeout=None):
+        """
+        Predict class probabilities for a single image and report the model version.
+
+        Args:
+            image_array: Image of shape (28, 28, 1)
+            timeout: Optional number of seconds to wait for the result
+
+        Returns:
+            tuple: (probabilities of shape (NUM_CLASSES,), model version)
+        """
+        return self.submit(image_array).result(timeout)
+
+    def submit(self, image_array: np.ndarray) -> Future:
+        """
+        Queue a single image without waiting for its prediction.
+
+        Async callers can await the result with asyncio.wrap_future(),
+        so no thread is blocked while the request waits for its batch.
+
+        Args:
+            image_array: Image of shape (28, 28, 1)
+
+        Returns:
+            Future: Resolves to (probabilities of shape (NUM_CLASSES,), model version)
+        """
+        if self._thread is None:
+            raise RuntimeError("BatchingPredictor has not been started")
+
+        future = Future()
+        self._queue.put((image_array, future))
+        # Updated on both ends so a stalled worker shows up as a growing queue
+        self._queue_depth.set(self._queue.qsize())
+        return future
+
+    def _collect_batch(self, first_item):
+        """Collect requests until the batch is full or the wait window expires."""
+        batch = [first_item]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Re-queue the sentinel so the worker loop exits after this batch
+                self._queue.put(None)
+                break
+            batch.append(item)
+
+        return batch
+
+    def _run(self):
+        """Worker loop: collect a batch, run one forward pass, resolve futures."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            batch = self._collect_batch(item)
+            images = [image for image, _ in batch]
+            futures = [future for _, future in batch]
+            BATCH_SIZE.labels('inference').observe(len(batch))
+            self._queue_depth.set(self._queue.qsize())
+
+            model, model_version = self.active
+            try:
+                x = np.stack(images).astype(np.float32, copy=False)
+                with stage_timer('batch_forward'):
+                    probs = model.predict(x, verbose=0)
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+
+            for future, row in zip(futures, probs):
+                future.set_result((row, model_version))
@@ -4,7 +4,7 @@ from tensorflow.keras import layers
 from tensorflow.keras.optimizers import Adam, SGD
 from .load_data import INPUT_SHAPE, NUM_CLASSES
 
-def create_model(extra_layer=False, optimizer='adam', dropout_rate=0.5):
+def create_model(extra_layer=False, optimizer='adam', dropout_rate=0.5, sparse_labels=False):
     """
     Create a convolutional neural network model for MNIST classification.
 
@@ -12,6 +12,8 @@ def create_model(extra_layer=False, optimizer='adam', dropout_rate=0.5):
         extra_layer (bool): Whether to add an extra dense layer before output.
         optimizer (str or keras Optimizer): Optimizer to compile the model with.
         dropout_rate (float): Dropout rate for the Dropout layer.
+        sparse_labels (bool): Whether the model is trained on integer class labels
+            (sparse categorical cross-entropy) instead of one-hot labels.
 
     Returns:
         keras.Sequential: Compiled Keras model
@@ -42,7 +44,7 @@ def create_model(extra_layer=False, optimizer='adam', dropout_rate=0.5):
             raise ValueError(f"Unsupported optimizer: {optimizer}")
 
     model.compile(
-        loss="categorical_crossentropy",
+        loss="sparse_categorical_crossentropy" if sparse_labels else "categorical_crossentropy",
         optimizer=optimizer,
         metrics=["accuracy"]
     )
@@ -1,11 +1,148 @@
 """
 Database helper module for storing and retrieving images in PostgreSQL.
 """
+import os
+import struct
+import functools
+import logging
+import threading
+from contextlib import contextmanager
 import numpy as np
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
+from psycopg2.pool import ThreadedConnectionPool, PoolError
 import io
-from typing import Tuple, Optional, Dict, Any
+from typing import Tuple, Optional, Dict, Any, List, Sequence, Iterator
+
+# Connection pool sizing (overridable through the environment)
+DB_POOL_MIN = int(os.getenv('DB_POOL_MIN', '1'))
+DB_POOL_MAX = int(os.getenv('DB_POOL_MAX', '10'))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+
+# Key of the advisory lock that serializes migrate_storage() runs
+MIGRATION_LOCK_ID = 0x6d6e6973
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of PostgreSQL connections.
+
+    Every borrowed connection is health-checked before it is handed out.
+    Broken connections (e.g. after a database restart) are discarded and
+    transparently replaced by fresh ones. When all connections are in use,
+    callers block until one is returned or the timeout expires.
+    """
+
+    def __init__(
+        self,
+        minconn: int = DB_POOL_MIN,
+        maxconn: int = DB_POOL_MAX,
+        timeout: float = DB_POOL_TIMEOUT,
+        health_check: bool = True,
+        host: str = "db",
+        database: str = "milestone_3",
+        user: str = "postgres",
+        password: str = "postgres"
+    ):
+        """
+        Args:
+            minconn: Number of connections opened up front
+            maxconn: Maximum number of simultaneously open connections
+            timeout: Seconds to wait for a free connection
+            health_check: Whether to ping connections before handing them out
+            host: Database host
+            database: Database name
+            user: Database user
+            password: Database password
+        """
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.health_check = health_check
+        self._pool = ThreadedConnectionPool(
+            minconn,
+            maxconn,
+            host=host,
+            database=database,
+            user=user,
+            password=password
+        )
+        self._slots = threading.BoundedSemaphore(maxconn)
+
+    def _is_healthy(self, conn) -> bool:
+        """Check whether a connection is still usable."""
+        if conn.closed:
+            return False
+        if not self.health_check:
+            return True
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            conn.rollback()
+            return True
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            return False
+
+    def _acquire(self):
+        """Get a healthy connection, replacing broken ones on the way."""
+        # Every idle connection may be stale after a database restart
+        for _ in range(self.maxconn + 1):
+            conn = self._pool.getconn()
+            if self._is_healthy(conn):
+                return conn
+            self._pool.putconn(conn, close=True)
+        raise psycopg2.OperationalError("Could not obtain a healthy database connection")
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection for the duration of a with-block.
+
+        Yields:
+            Database connection object
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolError("Timed out waiting for a database connection")
+
+        conn = None
+        try:
+            conn = self._acquire()
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            if conn is not None:
+                self._pool.putconn(conn, close=True)
+                conn = None
+            raise
+        except Exception:
+            if conn is not None and not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            if conn is not None:
+                self._pool.putconn(conn, close=bool(conn.closed))
+            self._slots.release()
+
+    def close(self) -> None:
+        """Close all connections in the pool."""
+        self._pool.closeall()
+
+
+def with_connection(func):
+    """
+    Allow a helper to be called with either a connection or a ConnectionPool.
+
+    When a ConnectionPool is passed as the first argument, a connection is
+    borrowed from it for the duration of the call.
+    """
+    @functools.wraps(func)
+    def wrapper(conn, *args, **kwargs):
+        if isinstance(conn, ConnectionPool):
+            with conn.connection() as pooled_conn:
+                return func(pooled_conn, *args, **kwargs)
+        return func(conn, *args, **kwargs)
+    return wrapper
 
 
 def serialize_image(image_array: np.ndarray) -> bytes:
@@ -44,6 +181,158 @@ def deserialize_image(image_bytes: bytes) -> np.ndarray:
     return np.load(buffer, allow_pickle=False)
 
 
+# Storage codecs of input_data.image_data
+IMAGE_CODEC_NPY = 'npy'   # Legacy np.save blob (header + pixels)
+IMAGE_CODEC_RAW = 'raw'   # Raw pixel bytes in image_dtype
+IMAGE_CODEC_U8 = 'u8'     # Float pixels in [0, 1] stored as uint8 (value * 255)
+
+
+def encode_images(image_arrays: np.ndarray) -> Tuple[np.ndarray, str, str]:
+    """
+    Encode one image or a stack of images with the compact storage codec.
+
+    Float images that sit exactly on the 1/255 grid (everything produced by
+    load_mnist_data() or decoded from an 8-bit image file) are stored as
+    uint8 pixels, which is lossless and 4x smaller than float32. Any other
+    array is stored as its raw bytes.
+
+    Args:
+        image_arrays: Numpy array of one image or a stack of images
+
+    Returns:
+        tuple: (pixels, image_dtype, image_codec) where pixels has the same
+            shape as the input and holds the bytes to store
+    """
+    image_arrays = np.ascontiguousarray(image_arrays)
+    dtype = image_arrays.dtype
+
+    if np.issubdtype(dtype, np.floating) and image_arrays.size:
+        scaled = np.rint(image_arrays * 255)
+        if scaled.min() >= 0 and scaled.max() <= 255:
+            pixels = scaled.astype(np.uint8)
+            # Only use the uint8 codec if decoding reproduces the input exactly
+            if np.array_equal(pixels.astype(dtype) / 255, image_arrays):
+                return pixels, dtype.name, IMAGE_CODEC_U8
+
+    return image_arrays, dtype.name, IMAGE_CODEC_RAW
+
+
+def decode_image(
+    image_bytes: bytes,
+    image_dims: Sequence[int],
+    image_dtype: str,
+    image_codec: str
+) -> np.ndarray:
+    """
+    Decode image_data from the database back to a numpy array.
+
+    Raw images are returned as a read-only zero-copy view of the buffer.
+
+    Args:
+        image_bytes: Stored image data
+        image_dims: Shape of the image
+        image_dtype: Dtype of the original image
+        image_codec: Storage codec of the image data
+
+    Returns:
+        np.ndarray: Reconstructed image array
+    """
+    if image_codec == IMAGE_CODEC_NPY:
+        return deserialize_image(bytes(image_bytes))
+    if image_codec == IMAGE_CODEC_U8:
+        pixels = np.frombuffer(image_bytes, dtype=np.uint8).reshape(image_dims)
+        return pixels.astype(image_dtype) / 255
+    if image_codec == IMAGE_CODEC_RAW:
+        return np.frombuffer(image_bytes, dtype=image_dtype).reshape(image_dims)
+    raise ValueError(f"Unknown image codec: {image_codec}")
+
+
+def decode_images(
+    image_bytes: Sequence[bytes],
+    image_dims: Sequence[Sequence[int]],
+    image_dtypes: Sequence[str],
+    image_codecs: Sequence[str]
+) -> np.ndarray:
+    """
+    Decode many stored images into one stacked numpy array.
+
+    When all images share the same shape, dtype and (non-legacy) codec,
+    the pixel buffers are joined and decoded in a single vectorized step.
+
+    Args:
+        image_bytes: Stored image data of each row
+        image_dims: Shape of each image
+        image_dtypes: Dtype of each image
+        image_codecs: Storage codec of each image
+
+    Returns:
+        np.ndarray: Images stacked along a new first axis
+    """
+    first = (list(image_dims[0]), image_dtypes[0], image_codecs[0])
+    uniform = first[2] != IMAGE_CODEC_NPY and all(
+        (list(dims), dtype, codec) == first
+        for dims, dtype, codec in zip(image_dims, image_dtypes, image_codecs)
+    )
+
+    if uniform:
+        dims, dtype, codec = first
+        batch_dims = [len(image_bytes)] + dims
+        return decode_image(b''.join(image_bytes), batch_dims, dtype, codec)
+
+    return np.stack([
+        decode_image(data, dims, dtype, codec)
+        for data, dims, dtype, codec in zip(image_bytes, image_dims, image_dtypes, image_codecs)
+    ])
+
+
+def encode_probabilities(prediction_probabilities: np.ndarray) -> List[float]:
+    """
+    Convert a probability distribution to a list for a REAL[] column.
+
+    Args:
+        prediction_probabilities: Full probability distribution
+
+    Returns:
+        list: Probabilities as Python floats
+    """
+    return np.asarray(prediction_probabilities, dtype=np.float32).tolist()
+
+
+# execute_values templates matching _input_data_row() and prediction rows
+_INPUT_DATA_TEMPLATE = "(%s, %s, %s, %s::smallint[], %s, %s)"
+_HASHED_INPUT_DATA_TEMPLATE = "(%s, %s, %s, %s::smallint[], %s, %s, %s)"
+_PREDICTION_TEMPLATE = "(%s, %s, %s, %s::real[], %s)"
+
+# Single-row input_data inserts; the upsert returns the ID of an existing
+# row with the same image_hash instead of storing the image again
+_INSERT_INPUT_SQL = """
+    INSERT INTO input_data
+    (image_data, true_label, image_shape, image_dims, image_dtype, image_codec)
+    VALUES (%s, %s, %s, %s::smallint[], %s, %s)
+    RETURNING id
+"""
+_UPSERT_INPUT_SQL = """
+    INSERT INTO input_data
+    (image_data, true_label, image_shape, image_dims, image_dtype, image_codec, image_hash)
+    VALUES (%s, %s, %s, %s::smallint[], %s, %s, %s)
+    ON CONFLICT (image_hash) WHERE image_hash IS NOT NULL
+    DO UPDATE SET image_hash = EXCLUDED.image_hash
+    RETURNING id
+"""
+
+def _input_data_row(image_array: np.ndarray, true_label: int) -> tuple:
+    """Build the column values of one input_data row."""
+    pixels, image_dtype, image_codec = encode_images(image_array)
+    return (
+        pixels.tobytes(),
+        int(true_label),
+        str(image_array.shape),
+        list(image_array.shape),
+        image_dtype,
+        image_codec
+    )
+
+
 def create_database(conn_params: Dict[str, str], db_name: str = "milestone_3") -> None:
     """
     Create the milestone_3 database if it doesn't exist.
@@ -79,6 +368,7 @@ def create_database(conn_params: Dict[str, str], db_name: str = "milestone_3") -
     conn.close()
 
 
+@with_connection
 def create_tables(conn) -> None:
     """
     Create the input_data and predictions tables if they don't exist.
@@ -87,9 +377,14 @@ def create_tables(conn) -> None:
     ----------------
     input_data table:
         - id (SERIAL PRIMARY KEY): Auto-incrementing unique identifier
-        - image_data (BYTEA): Serialized numpy array of the image
+        - image_data (BYTEA): Pixel bytes of the image (see image_codec)
         - true_label (INTEGER): The actual digit (0-9) in the image
         - image_shape (VARCHAR): Shape of the image for validation
+        - image_dims (SMALLINT[]): Shape of the image
+        - image_dtype (VARCHAR): Dtype of the image array
+        - image_codec (VARCHAR): Storage codec ('u8', 'raw' or legacy 'npy')
+        - image_hash (BYTEA): Content hash of the pixels, set only when inputs
+          are deduplicated (unique where not null)
         - created_at (TIMESTAMP): When the data was inserted
 
     predictions table:
@@ -97,11 +392,17 @@ def create_tables(conn) -> None:
         - input_data_id (INTEGER FOREIGN KEY): References input_data(id)
         - predicted_label (INTEGER): The predicted digit (0-9)
         - confidence (REAL): Confidence score of the prediction
-        - prediction_probabilities (BYTEA): Full probability distribution (serialized)
+        - prediction_probabilities (REAL[]): Full probability distribution
+        - model_version (VARCHAR): Version of the model that made the prediction
         - created_at (TIMESTAMP): When the prediction was made
 
+    bulk_load_progress table:
+        - source (VARCHAR PRIMARY KEY): Name of a bulk-loaded dataset
+        - rows_loaded (INTEGER): Number of rows committed so far
+        - updated_at (TIMESTAMP): When the last chunk was committed
+
     Args:
-        conn: Database connection object
+        conn: Database connection or ConnectionPool
     """
     cursor = conn.cursor()
 
@@ -112,6 +413,9 @@ def create_tables(conn) -> None:
             image_data BYTEA NOT NULL,
             true_label INTEGER NOT NULL,
             image_shape VARCHAR(50) NOT NULL,
+            image_dims SMALLINT[],
+            image_dtype VARCHAR(16),
+            image_codec VARCHAR(8) NOT NULL DEFAULT 'npy',
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     """)
@@ -123,11 +427,21 @@ def create_tables(conn) -> None:
             input_data_id INTEGER NOT NULL REFERENCES input_data(id) ON DELETE CASCADE,
             predicted_label INTEGER NOT NULL,
             confidence REAL NOT NULL,
-            prediction_probabilities BYTEA NOT NULL,
+            prediction_probabilities REAL[] NOT NULL,
+            model_version VARCHAR(64),
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     """)
 
+    # Track bulk loads so an interrupted load can be resumed
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS bulk_load_progress (
+            source VARCHAR(100) PRIMARY KEY,
+            rows_loaded INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
     # Create indexes for faster querying
     cursor.execute("""
         CREATE INDEX IF NOT EXISTS idx_input_data_label
@@ -144,11 +458,170 @@ def create_tables(conn) -> None:
         ON predictions(input_data_id)
     """)
 
+    # Predictions made before model versions were tracked have none
+    cursor.execute("""
+        ALTER TABLE predictions
+        ADD COLUMN IF NOT EXISTS model_version VARCHAR(64)
+    """)
+
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_predictions_model_version
+        ON predictions(model_version, input_data_id)
+    """)
+
+    # Content hash of deduplicated inputs; NULL for inputs stored as-is
+    cursor.execute("""
+        ALTER TABLE input_data
+        ADD COLUMN IF NOT EXISTS image_hash BYTEA
+    """)
+
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_input_data_image_hash
+        ON input_data(image_hash) WHERE image_hash IS NOT NULL
+    """)
+
     conn.commit()
     cursor.close()
     print("Tables created successfully")
 
 
+@with_connection
+def migrate_storage(conn, batch_size: int = 1000) -> None:
+    """
+    Migrate rows stored in the legacy np.save format to the compact codec.
+
+    Adds the image_dims, image_dtype and image_codec columns if missing,
+    re-encodes legacy image blobs in batches, and converts
+    prediction_probabilities from BYTEA to REAL[]. Safe to run repeatedly;
+    each batch is committed separately so the migration can be interrupted.
+
+    This is a one-off upgrade step (see scripts/migrate_db.py), not part of
+    create_tables(). Concurrent runs are serialized with a PostgreSQL
+    advisory lock, so a second run waits and then finds nothing to migrate.
+
+    Args:
+        conn: Database connection or ConnectionPool
+        batch_size: Number of rows converted per transaction
+    """
+    cursor = conn.cursor()
+
+    # Session-level lock: it has to outlive the per-batch commits below
+    cursor.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_ID,))
+    conn.commit()
+    try:
+        migrated_images, migrated_predictions = _migrate_storage(conn, cursor, batch_size)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_ID,))
+        conn.commit()
+        cursor.close()
+
+    if migrated_images or migrated_predictions:
+        print(f"Migrated {migrated_images} images and {migrated_predictions} "
+              f"predictions to the compact storage format")
+
+
+def _migrate_storage(conn, cursor, batch_size: int) -> Tuple[int, int]:
+    """
+    Run the steps of migrate_storage() while its advisory lock is held.
+
+    Returns:
+        tuple: (migrated_images, migrated_predictions)
+    """
+    cursor.execute("""
+        ALTER TABLE input_data
+        ADD COLUMN IF NOT EXISTS image_dims SMALLINT[],
+        ADD COLUMN IF NOT EXISTS image_dtype VARCHAR(16),
+        ADD COLUMN IF NOT EXISTS image_codec VARCHAR(8) NOT NULL DEFAULT 'npy'
+    """)
+    conn.commit()
+
+    migrated_images = 0
+    while True:
+        cursor.execute("""
+            SELECT id, image_data FROM input_data
+            WHERE image_codec = %s
+            ORDER BY id
+            LIMIT %s
+        """, (IMAGE_CODEC_NPY, batch_size))
+        rows = cursor.fetchall()
+        if not rows:
+            break
+
+        updates = []
+        for row_id, image_bytes in rows:
+            image_array = deserialize_image(bytes(image_bytes))
+            pixels, image_dtype, image_codec = encode_images(image_array)
+            updates.append(
+                (row_id, pixels.tobytes(), list(image_array.shape), image_dtype, image_codec)
+            )
+
+        execute_values(cursor, """
+            UPDATE input_data AS t
+            SET image_data = v.image_data,
+                image_dims = v.image_dims,
+                image_dtype = v.image_dtype,
+                image_codec = v.image_codec
+            FROM (VALUES %s) AS v(id, image_data, image_dims, image_dtype, image_codec)
+            WHERE t.id = v.id
+        """, updates, template="(%s, %s, %s::smallint[], %s, %s)", page_size=len(updates))
+        conn.commit()
+        migrated_images += len(rows)
+
+    cursor.execute("""
+        SELECT data_type FROM information_schema.columns
+        WHERE table_name = 'predictions' AND column_name = 'prediction_probabilities'
+    """)
+    row = cursor.fetchone()
+    migrated_predictions = 0
+    if row and row[0] == 'bytea':
+        cursor.execute("""
+            ALTER TABLE predictions
+            ADD COLUMN IF NOT EXISTS prediction_probabilities_real REAL[]
+        """)
+        conn.commit()
+
+        while True:
+            cursor.execute("""
+                SELECT id, prediction_probabilities FROM predictions
+                WHERE prediction_probabilities_real IS NULL
+                ORDER BY id
+                LIMIT %s
+            """, (batch_size,))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+
+            updates = [
+                (row_id, encode_probabilities(deserialize_image(bytes(prob_bytes)).ravel()))
+                for row_id, prob_bytes in rows
+            ]
+            execute_values(cursor, """
+                UPDATE predictions AS t
+                SET prediction_probabilities_real = v.probabilities
+                FROM (VALUES %s) AS v(id, probabilities)
+                WHERE t.id = v.id
+            """, updates, template="(%s, %s::real[])", page_size=len(updates))
+            conn.commit()
+            migrated_predictions += len(rows)
+
+        cursor.execute("ALTER TABLE predictions DROP COLUMN prediction_probabilities")
+        cursor.execute("""
+            ALTER TABLE predictions
+            RENAME COLUMN prediction_probabilities_real TO prediction_probabilities
+        """)
+        cursor.execute("""
+            ALTER TABLE predictions
+            ALTER COLUMN prediction_probabilities SET NOT NULL
+        """)
+        conn.commit()
+
+    return migrated_images, migrated_predictions
+
+
+@with_connection
 def insert_input_data(
     conn,
     image_array: np.ndarray,
@@ -158,7 +631,7 @@ def insert_input_data(
     Insert image data into the input_data table.
 
     Args:
-        conn: Database connection
+        conn: Database connection or ConnectionPool
         image_array: Numpy array of the image
         true_label: The true label of the image (0-9 for MNIST)
 
@@ -167,31 +640,232 @@ def insert_input_data(
     """
     cursor = conn.cursor()
 
-    # Serialize the image
-    image_bytes = serialize_image(image_array)
-    image_shape = str(image_array.shape)
+    # Encode the image with the compact storage codec
+    row = _input_data_row(image_array, true_label)
 
     # Insert into database
     cursor.execute("""
-        INSERT INTO input_data (image_data, true_label, image_shape)
-        VALUES (%s, %s, %s)
+        INSERT INTO input_data
+        (image_data, true_label, image_shape, image_dims, image_dtype, image_codec)
+        VALUES (%s, %s, %s, %s::smallint[], %s, %s)
         RETURNING id
-    """, (image_bytes, true_label, image_shape))
+    """, row)
 
     row_id = cursor.fetchone()[0]
     conn.commit()
     cursor.close()
 
-    print(f"Inserted image data with ID: {row_id}")
+    logger.debug("inserted input_data id=%s", row_id)
     return row_id
 
 
+@with_connection
+def insert_input_data_batch(
+    conn,
+    image_arrays: Sequence[np.ndarray],
+    true_labels: Sequence[int]
+) -> List[int]:
+    """
+    Insert many images into the input_data table in a single statement.
+
+    Args:
+        conn: Database connection or ConnectionPool
+        image_arrays: Numpy arrays of the images
+        true_labels: The true labels of the images (-1 if unknown)
+
+    Returns:
+        list: The IDs of the inserted rows, in the same order as the inputs
+    """
+    if len(image_arrays) != len(true_labels):
+        raise ValueError("image_arrays and true_labels must have the same length")
+    if len(image_arrays) == 0:
+        return []
+
+    cursor = conn.cursor()
+
+    rows = [
+        _input_data_row(image_array, true_label)
+        for image_array, true_label in zip(image_arrays, true_labels)
+    ]
+
+    # RETURNING yields the rows in VALUES order
+    result = execute_values(cursor, """
+        INSERT INTO input_data
+        (image_data, true_label, image_shape, image_dims, image_dtype, image_codec)
+        VALUES %s
+        RETURNING id
+    """, rows, template=_INPUT_DATA_TEMPLATE, page_size=len(rows), fetch=True)
+
+    row_ids = [row[0] for row in result]
+    conn.commit()
+    cursor.close()
+
+    return row_ids
+
+
+# Binary COPY framing: signature, flags field and header extension length
+_COPY_BINARY_HEADER = b'PGCOPY\n\xff\r\n\x00' + struct.pack('!ii', 0, 0)
+_COPY_BINARY_TRAILER = struct.pack('!h', -1)
+
+
+def _encode_copy_binary(image_arrays: np.ndarray, true_labels: np.ndarray) -> io.BytesIO:
+    """
+    Encode images and labels as a COPY (FORMAT binary) stream.
+
+    Each tuple holds the input_data columns image_data (bytea),
+    true_label (int4), image_shape (varchar), image_dims (int2[]),
+    image_dtype (varchar) and image_codec (varchar).
+
+    Args:
+        image_arrays: Numpy array of images, shape (n, ...)
+        true_labels: Integer labels, shape (n,)
+
+    Returns:
+        io.BytesIO: Buffer positioned at the start of the stream
+    """
+    buffer = io.BytesIO()
+    buffer.write(_COPY_BINARY_HEADER)
+
+    # The whole chunk is encoded with one vectorized codec call
+    pixels, image_dtype, image_codec = encode_images(image_arrays)
+    image_dims = image_arrays.shape[1:]
+
+    # Columns that are identical for every row are framed once
+    def text_field(value):
+        data = value.encode('utf-8')
+        return struct.pack('!i', len(data)) + data
+
+    # int2[] in array binary format: ndim, has-nulls flag, element OID,
+    # (size, lower bound) per dimension, then length-prefixed elements
+    dims_array = struct.pack('!iiiii', 1, 0, 21, len(image_dims), 1)
+    dims_array += b''.join(struct.pack('!ih', 2, dim) for dim in image_dims)
+    constant_fields = (
+        text_field(str(image_dims))
+        + struct.pack('!i', len(dims_array)) + dims_array
+        + text_field(image_dtype)
+        + text_field(image_codec)
+    )
+
+    pack_tuple = struct.Struct('!hi').pack
+    pack_label = struct.Struct('!ii').pack
+
+    for image_pixels, true_label in zip(pixels, true_labels):
+        image_bytes = image_pixels.tobytes()
+        buffer.write(pack_tuple(6, len(image_bytes)))
+        buffer.write(image_bytes)
+        buffer.write(pack_label(4, int(true_label)))
+        buffer.write(constant_fields)
+
+    buffer.write(_COPY_BINARY_TRAILER)
+    buffer.seek(0)
+    return buffer
+
+
+@with_connection
+def get_bulk_load_progress(conn, source: str) -> int:
+    """
+    Return how many rows of a bulk-loaded source have been committed.
+
+    Args:
+        conn: Database connection or ConnectionPool
+        source: Name of the bulk-loaded dataset
+
+    Returns:
+        int: Number of rows already loaded (0 if the source is unknown)
+    """
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT rows_loaded FROM bulk_load_progress WHERE source = %s",
+        (source,)
+    )
+    row = cursor.fetchone()
+    cursor.close()
+    conn.rollback()
+    return row[0] if row else 0
+
+
+@with_connection
+def bulk_load_input_data(
+    conn,
+    image_arrays: np.ndarray,
+    true_labels: np.ndarray,
+    source: str,
+    chunk_size: int = 10000,
+    resume: bool = True
+) -> int:
+    """
+    Bulk-load many images into input_data with COPY ... FROM STDIN (FORMAT binary).
+
+    Rows are streamed in chunks, and every chunk is committed together with
+    the progress counter of its source. An interrupted load resumes after
+    the last committed chunk when called again with the same source.
+
+    Args:
+        conn: Database connection or ConnectionPool
+        image_arrays: Numpy array of images, shape (n, ...)
+        true_labels: Labels, either class indices (n,) or one-hot (n, NUM_CLASSES)
+        source: Name identifying this dataset in bulk_load_progress
+        chunk_size: Number of rows per COPY and commit
+        resume: Skip the rows already committed for this source
+
+    Returns:
+        int: Number of rows loaded by this call
+    """
+    true_labels = np.asarray(true_labels)
+    if true_labels.ndim == 2:
+        true_labels = true_labels.argmax(axis=1)
+    if len(image_arrays) != len(true_labels):
+        raise ValueError("image_arrays and true_labels must have the same length")
+
+    start = get_bulk_load_progress(conn, source) if resume else 0
+    total = len(image_arrays)
+    if start >= total:
+        print(f"Source '{source}' already fully loaded ({total} rows)")
+        return 0
+
+    cursor = conn.cursor()
+    loaded = 0
+
+    try:
+        for chunk_start in range(start, total, chunk_size):
+            chunk_end = min(chunk_start + chunk_size, total)
+            buffer = _encode_copy_binary(
+                image_arrays[chunk_start:chunk_end],
+                true_labels[chunk_start:chunk_end]
+            )
+            cursor.copy_expert(
+                "COPY input_data (image_data, true_label, image_shape, "
+                "image_dims, image_dtype, image_codec) "
+                "FROM STDIN (FORMAT binary)",
+                buffer
+            )
+            cursor.execute("""
+                INSERT INTO bulk_load_progress (source, rows_loaded)
+                VALUES (%s, %s)
+                ON CONFLICT (source) DO UPDATE
+                SET rows_loaded = EXCLUDED.rows_loaded,
+                    updated_at = CURRENT_TIMESTAMP
+            """, (source, chunk_end))
+            conn.commit()
+
+            loaded += chunk_end - chunk_start
+            print(f"Loaded {chunk_end}/{total} rows of '{source}'")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    return loaded
+
+
+@with_connection
 def get_input_data(conn, data_id: int) -> Tuple[np.ndarray, int]:
     """
     Retrieve and deserialize image data from the database.
 
     Args:
-        conn: Database connection
+        conn: Database connection or ConnectionPool
         data_id: ID of the data to retrieve
 
     Returns:
@@ -200,7 +874,8 @@ def get_input_data(conn, data_id: int) -> Tuple[np.ndarray, int]:
     cursor = conn.cursor(cursor_factory=RealDictCursor)
 
     cursor.execute("""
-        SELECT image_data, true_label, image_shape
+        SELECT image_data, true_label, image_shape,
+               image_dims, image_dtype, image_codec
         FROM input_data
         WHERE id = %s
     """, (data_id,))
@@ -211,54 +886,354 @@ def get_input_data(conn, data_id: int) -> Tuple[np.ndarray, int]:
     if not row:
         raise ValueError(f"No data found with ID: {data_id}")
 
-    # Deserialize the image
-    image_array = deserialize_image(row['image_data'])
+    # Decode the image
+    image_array = decode_image(
+        row['image_data'],
+        row['image_dims'],
+        row['image_dtype'],
+        row['image_codec']
+    )
 
-    print(f"Retrieved image with shape: {row['image_shape']}")
+    logger.debug("retrieved input_data id=%s shape=%s", data_id, row['image_shape'])
     return image_array, row['true_label']
 
 
+def iter_input_data(
+    conn,
+    fetch_size: int = 1000,
+    start_after_id: int = 0,
+    max_id: Optional[int] = None,
+    unscored_by: Optional[str] = None
+) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Stream input_data in batches through a named server-side cursor.
+
+    Only one batch of rows is held in memory at a time, so memory usage
+    stays flat regardless of the table size. Rows are returned in id order.
+
+    Args:
+        conn: Database connection or ConnectionPool
+        fetch_size: Number of rows fetched and yielded per batch
+        start_after_id: Only return rows with an id greater than this
+        max_id: Optional upper bound (inclusive) on the returned ids
+        unscored_by: Optional model version; only rows without a prediction
+            from that version are returned
+
+    Yields:
+        tuple: (ids, images, labels) as numpy arrays of length <= fetch_size
+    """
+    if isinstance(conn, ConnectionPool):
+        # Keep the borrowed connection for the lifetime of the generator
+        with conn.connection() as pooled_conn:
+            yield from iter_input_data(pooled_conn, fetch_size, start_after_id, max_id, unscored_by)
+        return
+
+    cursor = conn.cursor(name=f"input_data_stream_{id(conn)}_{threading.get_ident()}")
+    cursor.itersize = fetch_size
+
+    try:
+        cursor.execute("""
+            SELECT id, true_label, image_data, image_dims, image_dtype, image_codec
+            FROM input_data
+            WHERE id > %s AND (%s::integer IS NULL OR id <= %s::integer)
+              AND (%s::varchar IS NULL OR NOT EXISTS (
+                  SELECT 1 FROM predictions p
+                  WHERE p.input_data_id = input_data.id AND p.model_version = %s::varchar
+              ))
+            ORDER BY id
+        """, (start_after_id, max_id, max_id, unscored_by, unscored_by))
+
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            ids, labels, image_bytes, image_dims, image_dtypes, image_codecs = zip(*rows)
+            images = decode_images(image_bytes, image_dims, image_dtypes, image_codecs)
+            yield (
+                np.asarray(ids, dtype=np.int64),
+                images,
+                np.asarray(labels, dtype=np.int64)
+            )
+    finally:
+        cursor.close()
+        conn.rollback()
+
+
+@with_connection
 def insert_prediction(
     conn,
     input_data_id: int,
     predicted_label: int,
     confidence: float,
-    prediction_probabilities: np.ndarray
+    prediction_probabilities: np.ndarray,
+    model_version: Optional[str] = None
 ) -> int:
     """
     Insert a prediction into the predictions table.
 
     Args:
-        conn: Database connection
+        conn: Database connection or ConnectionPool
         input_data_id: Foreign key reference to input_data table
         predicted_label: The predicted class (0-9 for MNIST)
         confidence: Confidence score of the prediction
         prediction_probabilities: Full probability distribution
+        model_version: Optional version of the model that made the prediction
 
     Returns:
         int: The ID of the inserted prediction
     """
     cursor = conn.cursor()
 
-    # Serialize the probability array
-    prob_bytes = serialize_image(prediction_probabilities)
+    # Store the probabilities as REAL[]
+    probabilities = encode_probabilities(prediction_probabilities)
 
     # Insert into database
     cursor.execute("""
         INSERT INTO predictions
-        (input_data_id, predicted_label, confidence, prediction_probabilities)
-        VALUES (%s, %s, %s, %s)
+        (input_data_id, predicted_label, confidence, prediction_probabilities, model_version)
+        VALUES (%s, %s, %s, %s::real[], %s)
         RETURNING id
-    """, (input_data_id, predicted_label, confidence, prob_bytes))
+    """, (input_data_id, predicted_label, confidence, probabilities, model_version))
 
     prediction_id = cursor.fetchone()[0]
     conn.commit()
     cursor.close()
 
-    print(f"Inserted prediction with ID: {prediction_id}")
+    logger.debug("inserted prediction id=%s", prediction_id)
     return prediction_id
 
 
+@with_connection
+def insert_input_and_prediction(
+    conn,
+    image_array: np.ndarray,
+    true_label: int,
+    predicted_label: int,
+    confidence: float,
+    prediction_probabilities: np.ndarray,
+    model_version: Optional[str] = None,
+    image_hash: Optional[bytes] = None
+) -> Tuple[int, int]:
+    """
+    Insert an image and its prediction in one statement and one transaction.
+
+    A data-modifying CTE inserts the input_data row and feeds its ID into
+    the predictions insert, so both rows are written in a single round trip.
+
+    Args:
+        conn: Database connection or ConnectionPool
+        image_array: Numpy array of the image
+        true_label: The true label of the image (-1 if unknown)
+        predicted_label: The predicted class (0-9 for MNIST)
+        confidence: Confidence score of the prediction
+        prediction_probabilities: Full probability distribution
+        model_version: Optional version of the model that made the prediction
+        image_hash: Optional content hash of the image. If given, an existing
+            input_data row with the same hash is reused instead of inserting
+            a duplicate
+
+    Returns:
+        tuple: (input_data_id, prediction_id)
+    """
+    cursor = conn.cursor()
+
+    input_row = _input_data_row(image_array, true_label)
+    probabilities = encode_probabilities(prediction_probabilities)
+
+    if image_hash is None:
+        input_sql, input_params = _INSERT_INPUT_SQL, input_row
+    else:
+        input_sql, input_params = _UPSERT_INPUT_SQL, input_row + (psycopg2.Binary(image_hash),)
+
+    cursor.execute(f"""
+        WITH new_input AS ({input_sql})
+        INSERT INTO predictions
+        (input_data_id, predicted_label, confidence, prediction_probabilities, model_version)
+        SELECT id, %s, %s, %s::real[], %s FROM new_input
+        RETURNING input_data_id, id
+    """, input_params + (predicted_label, confidence, probabilities, model_version))
+
+    input_data_id, prediction_id = cursor.fetchone()
+    conn.commit()
+    cursor.close()
+
+    return input_data_id, prediction_id
+
+
+@with_connection
+def insert_inputs_and_predictions_batch(
+    conn,
+    image_arrays: Sequence[np.ndarray],
+    true_labels: Sequence[int],
+    prediction_probabilities: Sequence[np.ndarray],
+    model_version: Optional[str] = None,
+    image_hashes: Optional[Sequence[bytes]] = None
+) -> Tuple[List[int], List[int]]:
+    """
+    Insert many images and their predictions in a single transaction.
+
+    Args:
+        conn: Database connection or ConnectionPool
+        image_arrays: Numpy arrays of the images
+        true_labels: The true labels of the images (-1 if unknown)
+        prediction_probabilities: Probability distribution of each image
+        model_version: Optional version of the model that made the predictions
+        image_hashes: Optional content hash of each image. If given, each
+            distinct image is stored once and existing input_data rows with
+            the same hash are reused
+
+    Returns:
+        tuple: (input_data_ids, prediction_ids), in the same order as the inputs
+    """
+    if not len(image_arrays) == len(true_labels) == len(prediction_probabilities):
+        raise ValueError("image_arrays, true_labels and prediction_probabilities must have the same length")
+    if len(image_arrays) == 0:
+        return [], []
+
+    cursor = conn.cursor()
+
+    try:
+        if image_hashes is None:
+            input_rows = [
+                _input_data_row(image_array, true_label)
+                for image_array, true_label in zip(image_arrays, true_labels)
+            ]
+            result = execute_values(cursor, """
+                INSERT INTO input_data
+                (image_data, true_label, image_shape, image_dims, image_dtype, image_codec)
+                VALUES %s
+                RETURNING id
+            """, input_rows, template=_INPUT_DATA_TEMPLATE, page_size=len(input_rows), fetch=True)
+            input_data_ids = [row[0] for row in result]
+        else:
+            # ON CONFLICT cannot touch the same row twice in one statement,
+            # so repeated images within the batch are sent once
+            first_index = {}
+            for index, image_hash in enumerate(image_hashes):
+                first_index.setdefault(bytes(image_hash), index)
+            input_rows = [
+                _input_data_row(image_arrays[index], true_labels[index]) + (psycopg2.Binary(image_hash),)
+                for image_hash, index in first_index.items()
+            ]
+            result = execute_values(cursor, """
+                INSERT INTO input_data
+                (image_data, true_label, image_shape, image_dims, image_dtype, image_codec, image_hash)
+                VALUES %s
+                ON CONFLICT (image_hash) WHERE image_hash IS NOT NULL
+                DO UPDATE SET image_hash = EXCLUDED.image_hash
+                RETURNING id, image_hash
+            """, input_rows, template=_HASHED_INPUT_DATA_TEMPLATE,
+                page_size=len(input_rows), fetch=True)
+            id_by_hash = {bytes(image_hash): input_data_id for input_data_id, image_hash in result}
+            input_data_ids = [id_by_hash[bytes(image_hash)] for image_hash in image_hashes]
+
+        prediction_rows = [
+            (input_data_id, int(probs.argmax()), float(probs.max()),
+             encode_probabilities(probs), model_version)
+            for input_data_id, probs in zip(input_data_ids, prediction_probabilities)
+        ]
+
+        result = execute_values(cursor, """
+            INSERT INTO predictions
+            (input_data_id, predicted_label, confidence, prediction_probabilities, model_version)
+            VALUES %s
+            RETURNING id
+        """, prediction_rows, template=_PREDICTION_TEMPLATE,
+            page_size=len(prediction_rows), fetch=True)
+        prediction_ids = [row[0] for row in result]
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    return input_data_ids, prediction_ids
+
+
+@with_connection
+def insert_predictions_batch(
+    conn,
+    input_data_ids: Sequence[int],
+    prediction_probabilities: np.ndarray,
+    model_version: Optional[str] = None
+) -> List[int]:
+    """
+    Insert many predictions into the predictions table in a single statement.
+
+    The predicted label and confidence of each row are derived from its
+    probability distribution.
+
+    Args:
+        conn: Database connection or ConnectionPool
+        input_data_ids: Foreign key references to the input_data table
+        prediction_probabilities: Probability distributions, shape (n, NUM_CLASSES)
+        model_version: Optional version of the model that made the predictions
+
+    Returns:
+        list: The IDs of the inserted predictions, in the same order as the inputs
+    """
+    if len(input_data_ids) != len(prediction_probabilities):
+        raise ValueError("input_data_ids and prediction_probabilities must have the same length")
+    if len(input_data_ids) == 0:
+        return []
+
+    cursor = conn.cursor()
+
+    rows = [
+        (int(input_data_id), int(probs.argmax()), float(probs.max()),
+         encode_probabilities(probs), model_version)
+        for input_data_id, probs in zip(input_data_ids, prediction_probabilities)
+    ]
+
+    result = execute_values(cursor, """
+        INSERT INTO predictions
+        (input_data_id, predicted_label, confidence, prediction_probabilities, model_version)
+        VALUES %s
+        RETURNING id
+    """, rows, template=_PREDICTION_TEMPLATE, page_size=len(rows), fetch=True)
+
+    prediction_ids = [row[0] for row in result]
+    conn.commit()
+    cursor.close()
+
+    return prediction_ids
+
+
+@with_connection
+def create_pool(
+    host: str = "db",
+    database: str = "milestone_3",
+    user: str = "postgres",
+    password: str = "postgres",
+    minconn: int = DB_POOL_MIN,
+    maxconn: int = DB_POOL_MAX
+) -> ConnectionPool:
+    """
+    Create a pool of database connections.
+
+    Args:
+        host: Database host
+        database: Database name
+        user: Database user
+        password: Database password
+        minconn: Number of connections opened up front
+        maxconn: Maximum number of simultaneously open connections
+
+    Returns:
+        ConnectionPool: Pool to pass to the helpers in place of a connection
+    """
+    return ConnectionPool(
+        minconn=minconn,
+        maxconn=maxconn,
+        host=host,
+        database=database,
+        user=user,
+        password=password
+    )
+
+
 def get_connection(
     host: str = "db",
     database: str = "milestone_3",
@@ -1,25 +1,148 @@
 """Data loading and preprocessing module for MNIST dataset."""
+import functools
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
 import numpy as np
+import tensorflow as tf
 from tensorflow import keras
 
 # Model / data parameters
 NUM_CLASSES = 10
 INPUT_SHAPE = (28, 28, 1)
 
+# Input pipeline defaults
+SHUFFLE_BUFFER = 10000
+VALIDATION_SPLIT = 0.1
 
-def load_mnist_data():
+# Directory of the preprocessed, memory-mappable dataset cache
+DATA_CACHE_DIR = os.getenv(
+    'DATA_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'mnist_preprocessed')
+)
+# Bump whenever the preprocessing below changes, so stale caches are not reused
+PREPROCESSING_VERSION = 1
+
+_ARRAY_NAMES = ('x_train', 'y_train', 'x_test', 'y_test')
+
+# In-process memo of loaded datasets, keyed by preprocessing hash
+_memo = {}
+_memo_lock = threading.Lock()
+
+
+def _preprocessing_key(**options):
+    """Hash everything that determines the preprocessed arrays."""
+    spec = {
+        'version': PREPROCESSING_VERSION,
+        'num_classes': NUM_CLASSES,
+        'input_shape': INPUT_SHAPE,
+        **options
+    }
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def _read_cache(cache_dir):
+    """Memory-map cached arrays, or return None if the cache is missing or unreadable."""
+    try:
+        return tuple(
+            np.load(os.path.join(cache_dir, f"{name}.npy"), mmap_mode='r')
+            for name in _ARRAY_NAMES
+        )
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        # E.g. a .npy file truncated by an interrupted copy
+        print(f"Ignoring unreadable dataset cache {cache_dir}: {e}")
+        return None
+
+
+def _write_cache(cache_dir, arrays):
+    """Write arrays to a temporary directory and move it into place atomically."""
+    parent = os.path.dirname(cache_dir)
+    os.makedirs(parent, exist_ok=True)
+    staging_dir = tempfile.mkdtemp(dir=parent, prefix='.staging-')
+    try:
+        for name, array in zip(_ARRAY_NAMES, arrays):
+            np.save(os.path.join(staging_dir, f"{name}.npy"), array)
+        if os.path.isdir(cache_dir) and _read_cache(cache_dir) is None:
+            # Replace an incomplete or corrupt cache instead of rebuilding on every load
+            shutil.rmtree(cache_dir, ignore_errors=True)
+        os.rename(staging_dir, cache_dir)
+    except OSError:
+        # Another process may have published the same cache first
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        if not os.path.isdir(cache_dir):
+            raise
+
+
+def _cached_arrays(build, cache=True, **options):
     """
-    Load and preprocess the MNIST dataset.
+    Return arrays from the in-process memo, the on-disk cache, or build().
+
+    Args:
+        build: Function returning the arrays (x_train, y_train, x_test, y_test)
+        cache: Whether to use the memo and the on-disk cache
+        **options: Preprocessing options that make up the cache key
 
     Returns:
-        tuple: ((x_train, y_train), (x_test, y_test))
-            - x_train: Training images (normalized, (n, 28, 28, 1))
-            - y_train: Training labels (one-hot encoded)
-            - x_test: Test images (normalized, (n, 28, 28, 1))
-            - y_test: Test labels (one-hot encoded)
+        tuple: The arrays, memory-mapped read-only when they come from the cache
     """
-    # Load the data and split it between train and test sets
+    if not cache:
+        return build()
+
+    key = _preprocessing_key(**options)
+    with _memo_lock:
+        if key in _memo:
+            return _memo[key]
+
+        cache_dir = os.path.join(DATA_CACHE_DIR, key)
+        arrays = _read_cache(cache_dir)
+        if arrays is None:
+            built = build()
+            try:
+                _write_cache(cache_dir, built)
+                # Serve the page-cache backed copy so processes share memory
+                arrays = _read_cache(cache_dir)
+            except OSError as e:
+                print(f"Could not write dataset cache {cache_dir}: {e}")
+            if arrays is None:
+                # The cache is unusable; serve the freshly built arrays instead
+                arrays = built
+        else:
+            print(f"Loaded preprocessed MNIST from {cache_dir}")
+
+        _memo[key] = arrays
+        return arrays
+
+
+def _build_raw():
+    """Load the raw uint8 MNIST arrays."""
     (x_train, y_train), (x_test, y_test) = keras.datasets.mnist.load_data()
+    return x_train, y_train, x_test, y_test
+
+
+def load_mnist_raw(cache=True):
+    """
+    Load the raw MNIST dataset as uint8 images and integer labels.
+
+    Args:
+        cache: Whether to use the memoized, memory-mapped dataset cache
+
+    Returns:
+        tuple: ((x_train, y_train), (x_test, y_test)) with images of shape
+            (n, 28, 28) and labels of shape (n,)
+    """
+    x_train, y_train, x_test, y_test = _cached_arrays(_build_raw, cache=cache, stage='raw')
+    return (x_train, y_train), (x_test, y_test)
+
+
+def _build_preprocessed(sparse_labels=False):
+    """Load and preprocess MNIST (float32 images in [0, 1], one-hot or integer labels)."""
+    # Load the data and split it between train and test sets
+    x_train, y_train, x_test, y_test = _build_raw()
 
     # Scale images to the [0, 1] range
     x_train = x_train.astype("float32") / 255
@@ -27,12 +150,193 @@ def load_mnist_data():
     # Make sure images have shape (28, 28, 1)
     x_train = np.expand_dims(x_train, -1)
     x_test = np.expand_dims(x_test, -1)
-    print("x_train shape:", x_train.shape)
-    print(x_train.shape[0], "train samples")
-    print(x_test.shape[0], "test samples")
+
+    if sparse_labels:
+        # Keep the uint8 class indices (1 byte per label instead of 40)
+        return x_train, y_train, x_test, y_test
 
     # Convert class vectors to binary class matrices
     y_train = keras.utils.to_categorical(y_train, NUM_CLASSES)
     y_test = keras.utils.to_categorical(y_test, NUM_CLASSES)
 
-    return (x_train, y_train), (x_test, y_test)
\ No newline at end of file
+    return x_train, y_train, x_test, y_test
+
+
+def load_mnist_data(cache=True, sparse_labels=False):
+    """
+    Load and preprocess the MNIST dataset.
+
+    The preprocessed arrays are cached as .npy files under DATA_CACHE_DIR,
+    keyed by a hash of the preprocessing, and memory-mapped on later loads,
+    so they load almost instantly and processes share the same pages.
+    Repeated calls in one process return the same arrays.
+
+    Args:
+        cache: Whether to use the cache. Cached arrays are read-only; pass
+            False to get fresh, writable in-memory arrays
+        sparse_labels: Whether to return integer class indices of shape (n,)
+            instead of one-hot labels (for sparse_categorical_crossentropy)
+
+    Returns:
+        tuple: ((x_train, y_train), (x_test, y_test))
+            - x_train: Training images (normalized, (n, 28, 28, 1))
+            - y_train: Training labels (one-hot encoded, or class indices)
+            - x_test: Test images (normalized, (n, 28, 28, 1))
+            - y_test: Test labels (one-hot encoded, or class indices)
+    """
+    x_train, y_train, x_test, y_test = _cached_arrays(
+        functools.partial(_build_preprocessed, sparse_labels=sparse_labels),
+        cache=cache,
+        stage='preprocessed',
+        image_dtype='float32',
+        labels='sparse' if sparse_labels else 'one_hot'
+    )
+    print("x_train shape:", x_train.shape)
+    print(x_train.shape[0], "train samples")
+    print(x_test.shape[0], "test samples")
+
+    return (x_train, y_train), (x_test, y_test)
+
+
+def _normalize_batch(x, y):
+    """Scale a uint8 image batch to [0, 1], add the channel axis and one-hot encode labels."""
+    x = tf.expand_dims(tf.cast(x, tf.float32) / 255.0, -1)
+    y = tf.one_hot(tf.cast(y, tf.int32), NUM_CLASSES)
+    return x, y
+
+
+def _normalize_batch_sparse(x, y):
+    """Scale a uint8 image batch to [0, 1] and add the channel axis; labels stay integers."""
+    x = tf.expand_dims(tf.cast(x, tf.float32) / 255.0, -1)
+    return x, tf.cast(y, tf.int32)
+
+
+def _gather_batch(x, y, indices):
+    """Read the samples at indices from the (memory-mapped) arrays x and y."""
+    def gather(indices):
+        # Fancy indexing copies just this batch out of the mapping
+        return x[indices], y[indices]
+
+    images, labels = tf.numpy_function(
+        gather, [indices], (tf.as_dtype(x.dtype), tf.as_dtype(y.dtype)), stateful=False
+    )
+    # numpy_function drops the static shapes
+    images.set_shape((None,) + x.shape[1:])
+    labels.set_shape((None,) + y.shape[1:])
+    return images, labels
+
+
+def _build_augmenter():
+    """Small random rotations and shifts that keep digits recognizable."""
+    return keras.Sequential([
+        keras.layers.RandomRotation(0.05, fill_mode='constant'),
+        keras.layers.RandomTranslation(0.1, 0.1, fill_mode='constant'),
+    ])
+
+
+def make_dataset(
+    x,
+    y,
+    batch_size=128,
+    shuffle=False,
+    shuffle_buffer=SHUFFLE_BUFFER,
+    augment=False,
+    seed=None,
+    sparse_labels=False
+):
+    """
+    Build a streaming tf.data pipeline over uint8 MNIST arrays.
+
+    The pipeline shuffles and batches sample indices only; each batch is
+    gathered from x and y when it is needed. Memory-mapped arrays (see
+    load_mnist_raw) are therefore read straight from the page cache instead
+    of being copied into the graph in every process. Images stay uint8 and
+    are normalized per batch on the fly, so no float32 copy of the whole
+    dataset is ever materialized.
+
+    Args:
+        x: uint8 images of shape (n, 28, 28)
+        y: Integer class labels of shape (n,)
+        batch_size: Number of samples per batch
+        shuffle: Whether to shuffle every epoch
+        shuffle_buffer: Size of the bounded shuffle buffer
+        augment: Whether to apply random rotations and shifts (in parallel)
+        seed: Optional random seed for shuffling
+        sparse_labels: Whether to yield integer labels instead of one-hot labels
+
+    Returns:
+        tf.data.Dataset: Batches of (images (b, 28, 28, 1) float32, labels)
+    """
+    if len(x) != len(y):
+        raise ValueError("x and y must have the same length")
+
+    dataset = tf.data.Dataset.range(len(x))
+    if shuffle:
+        dataset = dataset.shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+
+    # Batch first so gathering, normalization and augmentation run vectorized per batch
+    dataset = dataset.batch(batch_size)
+    dataset = dataset.map(
+        functools.partial(_gather_batch, x, y),
+        num_parallel_calls=tf.data.AUTOTUNE
+    )
+    dataset = dataset.map(
+        _normalize_batch_sparse if sparse_labels else _normalize_batch,
+        num_parallel_calls=tf.data.AUTOTUNE
+    )
+    if augment:
+        augmenter = _build_augmenter()
+        dataset = dataset.map(
+            lambda images, labels: (augmenter(images, training=True), labels),
+            num_parallel_calls=tf.data.AUTOTUNE
+        )
+
+    return dataset.prefetch(tf.data.AUTOTUNE)
+
+
+def load_mnist_datasets(
+    batch_size=128,
+    validation_split=VALIDATION_SPLIT,
+    shuffle_buffer=SHUFFLE_BUFFER,
+    augment=False,
+    seed=None,
+    sparse_labels=False
+):
+    """
+    Load MNIST as streaming train, validation and test pipelines.
+
+    Like Keras' validation_split, the last validation_split fraction of the
+    training set is held out for validation. Only the training pipeline is
+    shuffled and augmented.
+
+    Args:
+        batch_size: Number of samples per batch
+        validation_split: Fraction of the training set used for validation
+        shuffle_buffer: Size of the bounded shuffle buffer
+        augment: Whether to augment the training pipeline
+        seed: Optional random seed for shuffling
+        sparse_labels: Whether to yield integer labels instead of one-hot labels
+
+    Returns:
+        tuple: (train_dataset, validation_dataset, test_dataset)
+    """
+    (x_train, y_train), (x_test, y_test) = load_mnist_raw()
+
+    num_validation = int(len(x_train) * validation_split)
+    split = len(x_train) - num_validation
+
+    train_dataset = make_dataset(
+        x_train[:split], y_train[:split],
+        batch_size=batch_size,
+        shuffle=True,
+        shuffle_buffer=shuffle_buffer,
+        augment=augment,
+        seed=seed,
+        sparse_labels=sparse_labels
+    )
+    validation_dataset = make_dataset(
+        x_train[split:], y_train[split:], batch_size=batch_size, sparse_labels=sparse_labels
+    )
+    test_dataset = make_dataset(x_test, y_test, batch_size=batch_size, sparse_labels=sparse_labels)
+
+    return train_dataset, validation_dataset, test_dataset
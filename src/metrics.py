@@ -0,0 +1,110 @@
+"""
+Prometheus metrics for the serving path.
+
+Under a pre-fork server set PROMETHEUS_MULTIPROC_DIR (scripts/gunicorn.conf.py
+does this) so every worker writes its samples to a shared directory and
+/metrics reports the sum over all workers.
+"""
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess
+)
+
+# Sub-millisecond resolution for decode/preprocess stages up to seconds for slow DB writes
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+REQUESTS = Counter(
+    'mnist_requests_total',
+    'HTTP requests handled',
+    ['endpoint', 'status']
+)
+REQUEST_ERRORS = Counter(
+    'mnist_request_errors_total',
+    'HTTP requests answered with a 4xx or 5xx status',
+    ['endpoint']
+)
+REQUEST_LATENCY = Histogram(
+    'mnist_request_latency_seconds',
+    'End-to-end latency of HTTP requests',
+    ['endpoint'],
+    buckets=LATENCY_BUCKETS
+)
+# Stages: json_parse, base64_decode, preprocess, inference, batch_forward,
+# db_insert (input and prediction rows in one statement), db_batch_insert
+STAGE_LATENCY = Histogram(
+    'mnist_stage_latency_seconds',
+    'Latency of each processing stage',
+    ['stage'],
+    buckets=LATENCY_BUCKETS
+)
+# Sources: inference (batching engine), request (/predict/batch), db_write (write-behind)
+BATCH_SIZE = Histogram(
+    'mnist_batch_size',
+    'Number of images per batch',
+    ['source'],
+    buckets=BATCH_SIZE_BUCKETS
+)
+QUEUE_DEPTH = Gauge(
+    'mnist_queue_depth',
+    'Items waiting in a queue',
+    ['queue'],
+    multiprocess_mode='livesum'
+)
+CACHE_LOOKUPS = Counter(
+    'mnist_prediction_cache_lookups_total',
+    'Prediction cache lookups',
+    ['result']
+)
+
+
+def stage_timer(stage):
+    """
+    Time a processing stage.
+
+    Args:
+        stage: Stage name used as the 'stage' label
+
+    Returns:
+        Context manager that records the elapsed time in STAGE_LATENCY
+    """
+    return STAGE_LATENCY.labels(stage).time()
+
+
+def observe_request(endpoint, status, seconds):
+    """
+    Record one handled HTTP request.
+
+    Args:
+        endpoint: Name of the endpoint
+        status: HTTP status code of the response
+        seconds: Time spent handling the request
+    """
+    REQUESTS.labels(endpoint, str(status)).inc()
+    REQUEST_LATENCY.labels(endpoint).observe(seconds)
+    if status >= 400:
+        REQUEST_ERRORS.labels(endpoint).inc()
+
+
+def render_metrics():
+    """
+    Render all metrics in the Prometheus text format.
+
+    Returns:
+        tuple: (payload bytes, content type)
+    """
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
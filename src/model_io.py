@@ -1,10 +1,15 @@
 """Model I/O module for saving and loading trained models."""
 import os
-from tensorflow import keras
 
 # Default directory for model persistence (Docker volume mount point)
 MODEL_DIR = os.getenv('MODEL_DIR', '/app/models')
 DEFAULT_MODEL_NAME = 'mnist_model.h5'
+DEFAULT_TFLITE_NAME = 'mnist_model.tflite'
+DEFAULT_NUMPY_NAME = 'mnist_model.npz'
+DEFAULT_MMAP_NAME = 'mnist_model.weights'
+
+# Supported post-training quantization modes for TFLite export
+TFLITE_QUANTIZATIONS = (None, 'float16', 'int8')
 
 def save_model(model, filepath=None):
     """
@@ -32,9 +37,164 @@ def load_model(filepath=None):
     Returns:
         The loaded Keras model
     """
+    # Imported lazily so serving code can use this module without TensorFlow
+    from tensorflow import keras
+
     if filepath is None:
         filepath = os.path.join(MODEL_DIR, DEFAULT_MODEL_NAME)
 
     model = keras.models.load_model(filepath)
     print(f"Model loaded from {filepath}")
-    return model
\ No newline at end of file
+    return model
+
+
+def export_tflite(model, filepath=None, quantization=None, representative_data=None):
+    """
+    Export a Keras model to a TFLite flatbuffer for lightweight inference.
+
+    Args:
+        model: The Keras model to export
+        filepath: Optional custom filepath. If None, uses MODEL_DIR/mnist_model.tflite
+        quantization: None (float32), 'float16' or 'int8'
+        representative_data: Sample inputs used to calibrate int8 quantization,
+            e.g. a few hundred training images of shape (n, 28, 28, 1)
+
+    Returns:
+        str: Path of the exported model
+    """
+    import numpy as np
+    import tensorflow as tf
+
+    if quantization not in TFLITE_QUANTIZATIONS:
+        raise ValueError(f"Unsupported quantization: {quantization}")
+    if quantization == 'int8' and representative_data is None:
+        raise ValueError("int8 quantization requires representative_data")
+
+    if filepath is None:
+        os.makedirs(MODEL_DIR, exist_ok=True)
+        filepath = os.path.join(MODEL_DIR, DEFAULT_TFLITE_NAME)
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+
+    if quantization == 'float16':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantization == 'int8':
+        def representative_dataset():
+            for sample in representative_data:
+                yield [np.asarray(sample, dtype=np.float32)[np.newaxis]]
+
+        # Integer-only kernels; inputs and outputs stay float32 so callers
+        # do not need to know the model is quantized
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+
+    tflite_model = converter.convert()
+
+    with open(filepath, 'wb') as f:
+        f.write(tflite_model)
+
+    print(f"TFLite model ({quantization or 'float32'}) exported to {filepath}")
+    return filepath
+
+
+def _numpy_layer_configs(model):
+    """Return the layer configs of a Keras model in a JSON-serializable form."""
+    return [
+        {'class_name': layer.__class__.__name__, 'config': layer.get_config()}
+        for layer in model.layers
+    ]
+
+
+def export_numpy_weights(model, filepath=None):
+    """
+    Export a Keras model's layer configs and weights to a .npz file.
+
+    The file can be loaded by src.numpy_inference without TensorFlow.
+
+    Args:
+        model: The Keras model to export
+        filepath: Optional custom filepath. If None, uses MODEL_DIR/mnist_model.npz
+
+    Returns:
+        str: Path of the exported weights
+    """
+    import json
+    import numpy as np
+
+    if filepath is None:
+        os.makedirs(MODEL_DIR, exist_ok=True)
+        filepath = os.path.join(MODEL_DIR, DEFAULT_NUMPY_NAME)
+
+    layer_configs = _numpy_layer_configs(model)
+    arrays = {'__config__': np.array(json.dumps(layer_configs, default=str))}
+    for layer in model.layers:
+        for index, weight in enumerate(layer.get_weights()):
+            arrays[f"{layer.name}/{index}"] = weight
+
+    np.savez(filepath, **arrays)
+    print(f"NumPy weights exported to {filepath}")
+    return filepath
+
+
+def export_mmap_weights(model, directory=None):
+    """
+    Export a Keras model's layer configs and weights as one .npy file per array.
+
+    Unlike the .npz export, plain .npy files can be memory-mapped, so every
+    serving process that loads the directory with src.numpy_inference
+    shares the same physical pages instead of holding its own copy.
+    The files are written to a staging directory that then replaces any
+    previous export as a whole, so no stale .npy file is left behind.
+
+    Args:
+        model: The Keras model to export
+        directory: Optional custom directory. If None, uses MODEL_DIR/mnist_model.weights
+
+    Returns:
+        str: Path of the exported directory
+    """
+    import json
+    import shutil
+    import tempfile
+    import numpy as np
+
+    if directory is None:
+        directory = os.path.join(MODEL_DIR, DEFAULT_MMAP_NAME)
+    directory = os.path.abspath(directory)
+    parent = os.path.dirname(directory)
+    os.makedirs(parent, exist_ok=True)
+
+    # Write into a fresh directory so no .npy file of a previous export survives
+    staging_dir = tempfile.mkdtemp(dir=parent, prefix='.staging-')
+    # mkdtemp creates the directory private to its owner
+    os.chmod(staging_dir, 0o755)
+    old_dir = None
+    try:
+        with open(os.path.join(staging_dir, 'config.json'), 'w') as f:
+            json.dump(_numpy_layer_configs(model), f, default=str)
+        for layer in model.layers:
+            for index, weight in enumerate(layer.get_weights()):
+                np.save(
+                    os.path.join(staging_dir, f"{layer.name}.{index}.npy"),
+                    np.ascontiguousarray(weight, dtype=np.float32)
+                )
+
+        # Processes that mapped the old files keep reading them until they reload
+        if os.path.exists(directory):
+            old_dir = tempfile.mkdtemp(dir=parent, prefix='.old-')
+            os.rename(directory, os.path.join(old_dir, 'weights'))
+        os.rename(staging_dir, directory)
+    except BaseException:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        if old_dir is not None and not os.path.exists(directory):
+            # Put the previous export back
+            os.rename(os.path.join(old_dir, 'weights'), directory)
+            shutil.rmtree(old_dir, ignore_errors=True)
+        raise
+    if old_dir is not None:
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+    print(f"Memory-mappable weights exported to {directory}")
+    return directory
@@ -0,0 +1,314 @@
+"""
+File-based model registry with versions, metadata and an active pointer.
+
+Layout under MODEL_REGISTRY_DIR:
+
+    versions/<version>/<model files>
+    versions/<version>/metadata.json   # files + checksums, metrics, metadata
+    ACTIVE                             # name of the active version
+
+Every write goes to a temporary file first and is moved into place with
+os.replace, so readers never observe a half-written version or pointer.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from .model_io import MODEL_DIR, save_model
+
+MODEL_REGISTRY_DIR = os.getenv('MODEL_REGISTRY_DIR', os.path.join(MODEL_DIR, 'registry'))
+ACTIVE_POINTER = 'ACTIVE'
+METADATA_FILE = 'metadata.json'
+
+# Model file extensions served by each inference backend, in order of preference
+BACKEND_EXTENSIONS = {
+    'keras': ('.keras', '.h5'),
+    'tflite': ('.tflite',),
+    # Memory-mapped .weights directories are shared by pre-forked workers
+    'numpy': ('.weights', '.npz', '.keras')
+}
+
+
+def file_checksum(filepath):
+    """
+    Compute the SHA-256 checksum of a file.
+
+    Args:
+        filepath: Path of the file
+
+    Returns:
+        str: Hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def path_checksum(path):
+    """
+    Compute the SHA-256 checksum of a model file or model directory.
+
+    A directory (e.g. an export_mmap_weights() .weights directory) is hashed
+    over the names and checksums of its files, in sorted order.
+
+    Args:
+        path: Path of the file or directory
+
+    Returns:
+        str: Hex digest
+    """
+    if not os.path.isdir(path):
+        return file_checksum(path)
+    digest = hashlib.sha256()
+    for root, dirs, names in os.walk(path):
+        dirs.sort()
+        for name in sorted(names):
+            filepath = os.path.join(root, name)
+            digest.update(os.path.relpath(filepath, path).encode() + b'\0')
+            digest.update(file_checksum(filepath).encode())
+    return digest.hexdigest()
+
+
+def default_model_version(filepath):
+    """
+    Derive a version tag for an unregistered model file or directory.
+
+    Args:
+        filepath: Path of the model file or .weights directory
+
+    Returns:
+        str: File name (without extension) and a short checksum
+    """
+    name = os.path.splitext(os.path.basename(os.path.normpath(filepath)))[0]
+    return f"{name}@{path_checksum(filepath)[:12]}"
+
+
+def _write_atomic(filepath, content):
+    """Write text to a file so readers see either the old or the new content."""
+    directory = os.path.dirname(filepath)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    with os.fdopen(fd, 'w') as f:
+        f.write(content)
+    os.replace(tmp_path, filepath)
+
+
+def _version_dir(version, registry_dir=None):
+    return os.path.join(registry_dir or MODEL_REGISTRY_DIR, 'versions', version)
+
+
+def _copy_artifact(path, directory):
+    """Copy a model file, or a model directory such as a .weights export, into directory."""
+    path = os.path.normpath(path)
+    target = os.path.join(directory, os.path.basename(path))
+    if os.path.isdir(path):
+        shutil.copytree(path, target)
+    else:
+        shutil.copy2(path, target)
+
+
+def register_model(
+    source,
+    version=None,
+    metrics=None,
+    metadata=None,
+    extra_files=None,
+    registry_dir=None,
+    activate=False
+):
+    """
+    Store a model as a new version in the registry.
+
+    Args:
+        source: A Keras model, or the path of a saved model file
+        version: Optional version name. If None, a timestamp is used
+        metrics: Optional dict of evaluation metrics (e.g. test accuracy)
+        metadata: Optional dict of free-form metadata (e.g. hyperparameters)
+        extra_files: Optional paths of additional artifacts for the same model
+            (e.g. an exported .tflite file or .weights directory)
+        registry_dir: Optional registry directory. If None, uses MODEL_REGISTRY_DIR
+        activate: Whether to make this version the active one
+
+    Returns:
+        str: The registered version
+    """
+    registry_dir = registry_dir or MODEL_REGISTRY_DIR
+    version = version or datetime.now(timezone.utc).strftime('v%Y%m%d%H%M%S')
+    final_dir = _version_dir(version, registry_dir)
+    if os.path.exists(final_dir):
+        raise ValueError(f"Model version already exists: {version}")
+
+    os.makedirs(os.path.dirname(final_dir), exist_ok=True)
+    staging_dir = tempfile.mkdtemp(dir=os.path.dirname(final_dir), prefix='.staging-')
+    try:
+        if isinstance(source, (str, os.PathLike)):
+            _copy_artifact(source, staging_dir)
+        else:
+            save_model(source, filepath=os.path.join(staging_dir, 'model.keras'))
+        for path in extra_files or []:
+            _copy_artifact(path, staging_dir)
+
+        files = {
+            name: path_checksum(os.path.join(staging_dir, name))
+            for name in sorted(os.listdir(staging_dir))
+        }
+        info = {
+            'version': version,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'files': files,
+            'metrics': metrics or {},
+            'metadata': metadata or {}
+        }
+        with open(os.path.join(staging_dir, METADATA_FILE), 'w') as f:
+            json.dump(info, f, indent=2)
+
+        os.rename(staging_dir, final_dir)
+    except Exception:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+
+    print(f"Registered model version '{version}' in {registry_dir}")
+    if activate:
+        set_active_version(version, registry_dir)
+    return version
+
+
+def list_versions(registry_dir=None):
+    """
+    List the registered model versions, oldest first.
+
+    Args:
+        registry_dir: Optional registry directory. If None, uses MODEL_REGISTRY_DIR
+
+    Returns:
+        list: Metadata dict of each version
+    """
+    versions_dir = os.path.join(registry_dir or MODEL_REGISTRY_DIR, 'versions')
+    if not os.path.isdir(versions_dir):
+        return []
+    infos = []
+    for name in os.listdir(versions_dir):
+        if name.startswith('.'):
+            continue
+        infos.append(get_version_info(name, registry_dir))
+    return sorted(infos, key=lambda info: info['created_at'])
+
+
+def get_version_info(version, registry_dir=None):
+    """
+    Read the metadata of a registered version.
+
+    Args:
+        version: The model version
+        registry_dir: Optional registry directory. If None, uses MODEL_REGISTRY_DIR
+
+    Returns:
+        dict: Version metadata (files, checksums, metrics, metadata)
+    """
+    metadata_path = os.path.join(_version_dir(version, registry_dir), METADATA_FILE)
+    if not os.path.exists(metadata_path):
+        raise ValueError(f"Unknown model version: {version}")
+    with open(metadata_path) as f:
+        return json.load(f)
+
+
+def set_active_version(version, registry_dir=None):
+    """
+    Atomically point the registry at a version.
+
+    Args:
+        version: The model version to activate
+        registry_dir: Optional registry directory. If None, uses MODEL_REGISTRY_DIR
+    """
+    registry_dir = registry_dir or MODEL_REGISTRY_DIR
+    get_version_info(version, registry_dir)  # Fails for unknown versions
+    _write_atomic(os.path.join(registry_dir, ACTIVE_POINTER), version + '\n')
+    print(f"Active model version set to '{version}'")
+
+
+def get_active_version(registry_dir=None):
+    """
+    Return the active version, or None if nothing has been activated.
+
+    Args:
+        registry_dir: Optional registry directory. If None, uses MODEL_REGISTRY_DIR
+
+    Returns:
+        str or None: The active model version
+    """
+    pointer = os.path.join(registry_dir or MODEL_REGISTRY_DIR, ACTIVE_POINTER)
+    try:
+        with open(pointer) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def get_model_path(version, backend='keras', registry_dir=None, verify=True):
+    """
+    Locate the model file (or .weights directory) of a version for an inference backend.
+
+    Args:
+        version: The model version
+        backend: Inference backend that will load the file
+        registry_dir: Optional registry directory. If None, uses MODEL_REGISTRY_DIR
+        verify: Whether to check the file against its recorded checksum
+
+    Returns:
+        str: Path of the model file or directory
+    """
+    info = get_version_info(version, registry_dir)
+    for extension in BACKEND_EXTENSIONS[backend]:
+        for name, checksum in info['files'].items():
+            if not name.endswith(extension):
+                continue
+            path = os.path.join(_version_dir(version, registry_dir), name)
+            if verify and path_checksum(path) != checksum:
+                raise ValueError(f"Checksum mismatch for {path}")
+            return path
+    raise ValueError(f"Model version '{version}' has no file for the {backend} backend")
+
+
+class RegistryWatcher:
+    """
+    Poll the registry's active pointer and report version changes.
+
+    Call poll() periodically; it returns the new active version when the
+    pointer has changed since the last call, and None otherwise. A version
+    passed to reject() is not reported again until the pointer moves to a
+    different version.
+    """
+
+    def __init__(self, registry_dir=None, current_version=None):
+        """
+        Args:
+            registry_dir: Optional registry directory. If None, uses MODEL_REGISTRY_DIR
+            current_version: The version that is currently served
+        """
+        self.registry_dir = registry_dir or MODEL_REGISTRY_DIR
+        self.current_version = current_version
+        self.rejected_version = None
+        self.last_checked = None
+
+    def poll(self):
+        """Return the newly activated version, or None if unchanged."""
+        self.last_checked = time.time()
+        active = get_active_version(self.registry_dir)
+        if active != self.rejected_version:
+            self.rejected_version = None
+        if active is None or active in (self.current_version, self.rejected_version):
+            return None
+        return active
+
+    def acknowledge(self, version):
+        """Record that a version is now being served."""
+        self.current_version = version
+
+    def reject(self, version):
+        """Record that a version failed to load, so poll() stops reporting it."""
+        self.rejected_version = version
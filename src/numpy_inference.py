@@ -0,0 +1,242 @@
+"""Pure-NumPy inference engine for the MNIST CNN architecture."""
+import io
+import json
+import os
+import zipfile
+import numpy as np
+
+
+def _activation(name):
+    """Return a vectorized NumPy implementation of a Keras activation."""
+    if name in (None, 'linear'):
+        return lambda x: x
+    if name == 'relu':
+        return lambda x: np.maximum(x, 0, out=x)
+    if name == 'softmax':
+        def softmax(x):
+            x = x - x.max(axis=-1, keepdims=True)
+            np.exp(x, out=x)
+            x /= x.sum(axis=-1, keepdims=True)
+            return x
+        return softmax
+    raise NotImplementedError(f"Unsupported activation: {name}")
+
+
+def _pad_same(x, kernel_size, strides):
+    """Zero-pad a NHWC batch the way Keras does for padding='same'."""
+    pads = []
+    for size, kernel, stride in zip(x.shape[1:3], kernel_size, strides):
+        out = -(-size // stride)
+        total = max((out - 1) * stride + kernel - size, 0)
+        pads.append((total // 2, total - total // 2))
+    return np.pad(x, [(0, 0), pads[0], pads[1], (0, 0)])
+
+
+class Conv2D:
+    """2D convolution as im2col + GEMM."""
+
+    def __init__(self, config, kernel, bias):
+        self.kernel_size = tuple(config['kernel_size'])
+        self.strides = tuple(config.get('strides', (1, 1)))
+        self.padding = config.get('padding', 'valid')
+        self.activation = _activation(config.get('activation'))
+        kh, kw, c_in, c_out = kernel.shape
+        # HWIO kernel flattened in the same (kh, kw, c_in) order as the patches
+        self.kernel = np.ascontiguousarray(kernel.reshape(kh * kw * c_in, c_out), dtype=np.float32)
+        self.bias = None if bias is None else np.asarray(bias, dtype=np.float32)
+
+    def __call__(self, x):
+        if self.padding == 'same':
+            x = _pad_same(x, self.kernel_size, self.strides)
+        kh, kw = self.kernel_size
+        sh, sw = self.strides
+
+        # (n, h_out, w_out, c, kh, kw) view, no copy yet
+        patches = np.lib.stride_tricks.sliding_window_view(x, (kh, kw), axis=(1, 2))
+        patches = patches[:, ::sh, ::sw]
+        n, h_out, w_out, c_in = patches.shape[:4]
+        # im2col: one row per output pixel, laid out as (kh, kw, c)
+        cols = patches.transpose(0, 1, 2, 4, 5, 3).reshape(n * h_out * w_out, kh * kw * c_in)
+
+        out = cols @ self.kernel
+        if self.bias is not None:
+            out += self.bias
+        return self.activation(out.reshape(n, h_out, w_out, -1))
+
+
+class MaxPooling2D:
+    """Non-overlapping max pooling (pool_size == strides, padding='valid')."""
+
+    def __init__(self, config):
+        self.pool_size = tuple(config.get('pool_size', (2, 2)))
+        strides = config.get('strides') or self.pool_size
+        if tuple(strides) != self.pool_size or config.get('padding', 'valid') != 'valid':
+            raise NotImplementedError("Only non-overlapping 'valid' max pooling is supported")
+
+    def __call__(self, x):
+        ph, pw = self.pool_size
+        n, h, w, c = x.shape
+        h_out, w_out = h // ph, w // pw
+        x = x[:, :h_out * ph, :w_out * pw]
+        return x.reshape(n, h_out, ph, w_out, pw, c).max(axis=(2, 4))
+
+
+class Dense:
+    """Fully connected layer."""
+
+    def __init__(self, config, kernel, bias):
+        self.activation = _activation(config.get('activation'))
+        self.kernel = np.ascontiguousarray(kernel, dtype=np.float32)
+        self.bias = None if bias is None else np.asarray(bias, dtype=np.float32)
+
+    def __call__(self, x):
+        out = x @ self.kernel
+        if self.bias is not None:
+            out += self.bias
+        return self.activation(out)
+
+
+def _flatten(x):
+    """Flatten NHWC feature maps in the same (h, w, c) order as Keras."""
+    return x.reshape(len(x), -1)
+
+
+def _identity(x):
+    """Layers that are no-ops at inference time (Dropout, InputLayer)."""
+    return x
+
+
+class NumpyModel:
+    """
+    Sequential CNN forward pass implemented with vectorized NumPy.
+
+    Supports the layers used by create_model(): Conv2D, MaxPooling2D,
+    Flatten, Dropout and Dense. Exposes predict(x, verbose=0) like a Keras
+    model, so it can be used as an inference backend without TensorFlow.
+    """
+
+    name = 'numpy'
+
+    def __init__(self, layer_configs, weights):
+        """
+        Args:
+            layer_configs: Keras layer configs ({'class_name', 'config'}) in order
+            weights: Dict mapping layer name to its list of weight arrays
+        """
+        self.layers = []
+        for layer in layer_configs:
+            class_name = layer['class_name']
+            config = layer['config']
+            variables = weights.get(config.get('name'), [])
+            kernel = variables[0] if variables else None
+            bias = variables[1] if len(variables) > 1 else None
+
+            if class_name == 'Conv2D':
+                self.layers.append(Conv2D(config, kernel, bias))
+            elif class_name == 'MaxPooling2D':
+                self.layers.append(MaxPooling2D(config))
+            elif class_name == 'Dense':
+                self.layers.append(Dense(config, kernel, bias))
+            elif class_name == 'Flatten':
+                self.layers.append(_flatten)
+            elif class_name in ('Dropout', 'InputLayer'):
+                self.layers.append(_identity)
+            else:
+                raise NotImplementedError(f"Unsupported layer: {class_name}")
+
+    def predict(self, x, verbose=0):
+        """Return class probabilities for a batch of inputs."""
+        x = np.asarray(x, dtype=np.float32)
+        for layer in self.layers:
+            x = layer(x)
+        return x
+
+
+def _find_layer_vars(h5file, layer_name):
+    """Locate the weight variables of a layer in a Keras 3 weights file."""
+    found = []
+
+    def visit(path, obj):
+        if (path == f"{layer_name}/vars" or path.endswith(f"/{layer_name}/vars")) and not found:
+            found.append(obj)
+
+    h5file.visititems(visit)
+    if not found:
+        return []
+    group = found[0]
+    return [np.asarray(group[key]) for key in sorted(group.keys(), key=int)]
+
+
+def _load_keras_archive(filepath):
+    """Read layer configs and weights from a .keras zip archive (needs h5py)."""
+    import h5py
+
+    with zipfile.ZipFile(filepath) as archive:
+        config = json.loads(archive.read('config.json'))
+        weights_bytes = archive.read('model.weights.h5')
+
+    layer_configs = config['config']['layers']
+    weights = {}
+    with h5py.File(io.BytesIO(weights_bytes), 'r') as h5file:
+        for layer in layer_configs:
+            name = layer['config'].get('name')
+            if layer['class_name'] in ('Conv2D', 'Dense'):
+                weights[name] = _find_layer_vars(h5file, name)
+    return layer_configs, weights
+
+
+def _load_npz(filepath):
+    """Read layer configs and weights from an export_numpy_weights() file."""
+    with np.load(filepath, allow_pickle=False) as data:
+        layer_configs = json.loads(str(data['__config__']))
+        weights = {}
+        for key in data.files:
+            if key == '__config__':
+                continue
+            layer_name, index = key.rsplit('/', 1)
+            weights.setdefault(layer_name, []).append((int(index), data[key]))
+    weights = {
+        name: [array for _, array in sorted(arrays, key=lambda item: item[0])]
+        for name, arrays in weights.items()
+    }
+    return layer_configs, weights
+
+
+def _load_mmap_dir(directory):
+    """Read layer configs and memory-mapped weights from an export_mmap_weights() directory."""
+    with open(os.path.join(directory, 'config.json')) as f:
+        layer_configs = json.load(f)
+    weights = {}
+    for name in os.listdir(directory):
+        if not name.endswith('.npy'):
+            continue
+        layer_name, index = name[:-len('.npy')].rsplit('.', 1)
+        # Read-only mappings are backed by the page cache and shared between processes
+        array = np.load(os.path.join(directory, name), mmap_mode='r')
+        weights.setdefault(layer_name, []).append((int(index), array))
+    weights = {
+        name: [array for _, array in sorted(arrays, key=lambda item: item[0])]
+        for name, arrays in weights.items()
+    }
+    return layer_configs, weights
+
+
+def load_numpy_model(filepath):
+    """
+    Load a saved model into the NumPy inference engine.
+
+    Args:
+        filepath: Path of a .keras archive, a .npz file written by
+            model_io.export_numpy_weights(), or a directory written by
+            model_io.export_mmap_weights() (weights are memory-mapped)
+
+    Returns:
+        NumpyModel: Model ready for predict()
+    """
+    if os.path.isdir(filepath):
+        layer_configs, weights = _load_mmap_dir(filepath)
+    elif filepath.endswith('.npz'):
+        layer_configs, weights = _load_npz(filepath)
+    else:
+        layer_configs, weights = _load_keras_archive(filepath)
+    return NumpyModel(layer_configs, weights)
@@ -1,4 +1,16 @@
 """Prediction module for MNIST model."""
+import os
+import threading
+import time
+import numpy as np
+
+# Inference backend used by the serving code ('keras', 'tflite' or 'numpy')
+INFERENCE_BACKEND = os.getenv('INFERENCE_BACKEND', 'keras').lower()
+
+# Threads used inside one op and for running independent ops concurrently
+# (0 keeps the runtime's default, which assumes the process owns every core)
+INTRA_OP_THREADS = int(os.getenv('INTRA_OP_THREADS', '0'))
+INTER_OP_THREADS = int(os.getenv('INTER_OP_THREADS', '0'))
 
 
 def predict(model, x):
@@ -29,4 +41,190 @@ def predict_classes(model, x):
     """
     predictions = model.predict(x)
     predicted_classes = predictions.argmax(axis=1)
-    return predicted_classes
\ No newline at end of file
+    return predicted_classes
+
+
+def warm_up(model, batch_sizes, input_shape=(28, 28, 1)):
+    """
+    Run dummy batches through the model so the first real request is fast.
+
+    The first call at each batch size pays graph tracing and allocator
+    warm-up; doing this at startup moves that cost out of the request path.
+
+    Args:
+        model: The Keras model to warm up
+        batch_sizes: Batch sizes to run
+        input_shape: Shape of a single input sample
+
+    Returns:
+        dict: Seconds spent on each batch size
+    """
+    timings = {}
+    for batch_size in sorted(set(batch_sizes)):
+        dummy = np.zeros((batch_size, *input_shape), dtype=np.float32)
+        start = time.perf_counter()
+        model.predict(dummy, verbose=0)
+        timings[batch_size] = time.perf_counter() - start
+    return timings
+
+
+def configure_threads(backend=None, intra_op_threads=None, inter_op_threads=None):
+    """
+    Limit the threads an inference runtime uses in this process.
+
+    Must run before the model is loaded. With several serving processes on
+    one machine, each should get its share of the cores instead of every
+    process spawning one thread per core.
+
+    TensorFlow takes both settings here; the TFLite backend reads
+    INTRA_OP_THREADS when it creates its interpreter. BLAS threads used by
+    the NumPy backend can only be limited through OMP_NUM_THREADS and
+    friends before NumPy is imported (see scripts/gunicorn.conf.py).
+
+    Args:
+        backend: Inference backend. If None, uses INFERENCE_BACKEND
+        intra_op_threads: Threads per op. If None, uses INTRA_OP_THREADS
+        inter_op_threads: Concurrent ops. If None, uses INTER_OP_THREADS
+    """
+    backend = (backend or INFERENCE_BACKEND).lower()
+    intra_op_threads = INTRA_OP_THREADS if intra_op_threads is None else intra_op_threads
+    inter_op_threads = INTER_OP_THREADS if inter_op_threads is None else inter_op_threads
+
+    if backend != 'keras':
+        return
+
+    import tensorflow as tf
+    try:
+        if intra_op_threads > 0:
+            tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+        if inter_op_threads > 0:
+            tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+    except RuntimeError as e:
+        # Raised once the TensorFlow runtime has been initialized
+        print(f"Could not set TensorFlow thread counts: {e}")
+
+
+class KerasBackend:
+    """Inference backend running a saved Keras model (imports TensorFlow)."""
+
+    name = 'keras'
+
+    def __init__(self, filepath):
+        """
+        Args:
+            filepath: Path of the saved Keras model
+        """
+        from .model_io import load_model
+        self.model = load_model(filepath)
+
+    def predict(self, x, verbose=0):
+        """Return class probabilities for a batch of inputs."""
+        return self.model.predict(x, verbose=verbose)
+
+
+def _load_tflite_interpreter(filepath):
+    """Create a TFLite interpreter from the slimmest runtime available."""
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            # Fall back to the interpreter bundled with full TensorFlow
+            from tensorflow.lite import Interpreter
+    # model_path lets the runtime memory-map the flatbuffer, so processes
+    # serving the same file share its weights through the page cache
+    return Interpreter(model_path=filepath, num_threads=INTRA_OP_THREADS or None)
+
+
+class TFLiteBackend:
+    """
+    Inference backend running an exported TFLite model.
+
+    Only the TFLite interpreter is loaded, which keeps import time and
+    memory far below a full TensorFlow process. Quantized input and output
+    tensors are (de)quantized transparently.
+    """
+
+    name = 'tflite'
+
+    def __init__(self, filepath):
+        """
+        Args:
+            filepath: Path of the exported .tflite model
+        """
+        self.interpreter = _load_tflite_interpreter(filepath)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self._batch_size = None
+        # The interpreter holds mutable state and must not be shared between threads
+        self._lock = threading.Lock()
+
+    def _resize(self, batch_size):
+        """Resize the input tensor when the batch size changes."""
+        if batch_size == self._batch_size:
+            return
+        shape = [batch_size, *self._input['shape'][1:]]
+        self.interpreter.resize_tensor_input(self._input['index'], shape)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self._batch_size = batch_size
+
+    def predict(self, x, verbose=0):
+        """Return class probabilities for a batch of inputs."""
+        x = np.asarray(x, dtype=np.float32)
+
+        with self._lock:
+            self._resize(len(x))
+
+            scale, zero_point = self._input['quantization']
+            if self._input['dtype'] != np.float32 and scale:
+                x = np.round(x / scale + zero_point)
+            self.interpreter.set_tensor(self._input['index'], x.astype(self._input['dtype']))
+            self.interpreter.invoke()
+            output = self.interpreter.get_tensor(self._output['index'])
+
+            scale, zero_point = self._output['quantization']
+            if self._output['dtype'] != np.float32 and scale:
+                output = (output.astype(np.float32) - zero_point) * scale
+
+        return output.astype(np.float32, copy=False)
+
+
+def _load_numpy_backend(filepath):
+    """Load a model into the pure-NumPy inference engine."""
+    from .numpy_inference import load_numpy_model
+    return load_numpy_model(filepath)
+
+
+BACKENDS = {
+    KerasBackend.name: KerasBackend,
+    TFLiteBackend.name: TFLiteBackend,
+    'numpy': _load_numpy_backend
+}
+
+
+def load_backend(filepath, backend=None):
+    """
+    Load a model for inference with the selected backend.
+
+    The returned object exposes predict(x, verbose=0) like a Keras model,
+    so it can be used anywhere the serving code expects a model.
+
+    Args:
+        filepath: Path of the saved model for the chosen backend
+        backend: 'keras', 'tflite' or 'numpy'. If None, uses INFERENCE_BACKEND
+
+    Returns:
+        Inference backend wrapping the loaded model
+    """
+    backend = (backend or INFERENCE_BACKEND).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unsupported inference backend: {backend}")
+
+    start = time.perf_counter()
+    loaded = BACKENDS[backend](filepath)
+    print(f"Loaded {backend} backend from {filepath} in {time.perf_counter() - start:.2f}s")
+    return loaded
@@ -0,0 +1,234 @@
+"""Content-hash cache of predictions for repeated images."""
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+# Cache sizing (overridable through the environment; a size of 0 disables the cache)
+PREDICTION_CACHE_SIZE = int(os.getenv('PREDICTION_CACHE_SIZE', '10000'))
+PREDICTION_CACHE_TTL = float(os.getenv('PREDICTION_CACHE_TTL', '3600'))
+# Optional SQLite file shared by all worker processes on this machine
+PREDICTION_CACHE_PATH = os.getenv('PREDICTION_CACHE_PATH', '')
+
+logger = logging.getLogger(__name__)
+
+
+def image_hash(image_array: np.ndarray) -> bytes:
+    """
+    Hash the decoded pixel buffer of an image.
+
+    Args:
+        image_array: Preprocessed image, e.g. of shape (28, 28, 1)
+
+    Returns:
+        bytes: 16-byte BLAKE2b digest of the shape, dtype and pixels
+    """
+    image_array = np.ascontiguousarray(image_array)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{image_array.dtype.str}{image_array.shape}".encode())
+    digest.update(image_array.data)
+    return digest.digest()
+
+
+class SharedCacheStore:
+    """
+    SQLite-backed cache store shared by the processes of one machine.
+
+    Each thread uses its own connection; the database runs in WAL mode so
+    readers in other workers are not blocked by writers. SQLite allows only
+    one writer at a time, so a lookup or write that fails (e.g. "database is
+    locked") is treated as a miss or a skipped write rather than an error:
+    the cache must never fail a request whose prediction succeeded.
+    """
+
+    def __init__(self, path: str, ttl: float = PREDICTION_CACHE_TTL):
+        """
+        Args:
+            path: SQLite database file (e.g. on /dev/shm for a RAM-backed store)
+            ttl: Seconds an entry stays valid
+        """
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        self._puts = 0
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS prediction_cache (
+                    key BLOB PRIMARY KEY,
+                    probabilities BLOB NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        """Return the cached probabilities, or None if missing, expired or unavailable."""
+        try:
+            row = self._connection().execute(
+                "SELECT probabilities FROM prediction_cache WHERE key = ? AND created_at > ?",
+                (key, time.time() - self.ttl)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.debug("Shared cache lookup failed, treating as a miss: %s", e)
+            return None
+        if row is None:
+            return None
+        return np.frombuffer(row[0], dtype=np.float32)
+
+    def put(self, key: bytes, prediction_probabilities: np.ndarray) -> None:
+        """Store probabilities and occasionally purge expired entries (skipped if the store is busy)."""
+        probabilities = np.asarray(prediction_probabilities, dtype=np.float32).tobytes()
+        try:
+            with self._connection() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO prediction_cache VALUES (?, ?, ?)",
+                    (key, probabilities, time.time())
+                )
+                self._puts += 1
+                if self._puts % 1000 == 0:
+                    conn.execute(
+                        "DELETE FROM prediction_cache WHERE created_at <= ?",
+                        (time.time() - self.ttl,)
+                    )
+        except sqlite3.Error as e:
+            logger.debug("Shared cache write skipped: %s", e)
+
+
+class PredictionCache:
+    """
+    LRU cache with TTL mapping (model version, image hash) to probabilities.
+
+    Entries are scoped to the model version that produced them, so a
+    hot-swapped model never serves predictions of its predecessor. With a
+    shared store, a miss in this process falls back to the store, so hits
+    are shared between worker processes.
+    """
+
+    def __init__(
+        self,
+        max_size: int = PREDICTION_CACHE_SIZE,
+        ttl: float = PREDICTION_CACHE_TTL,
+        store: Optional[SharedCacheStore] = None
+    ):
+        """
+        Args:
+            max_size: Maximum number of entries held in this process
+            ttl: Seconds an entry stays valid
+            store: Optional SharedCacheStore behind the in-process cache
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.store = store
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'shared_hits': 0, 'misses': 0, 'evictions': 0}
+
+    @staticmethod
+    def _key(model_version, digest: bytes) -> bytes:
+        return str(model_version).encode() + b'\0' + digest
+
+    def get(self, model_version, digest: bytes) -> Optional[np.ndarray]:
+        """
+        Look up the probabilities of an image for a model version.
+
+        Args:
+            model_version: Version of the model the prediction must come from
+            digest: image_hash() of the image
+
+        Returns:
+            np.ndarray or None: Cached probabilities, or None on a miss
+        """
+        key = self._key(model_version, digest)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                probabilities, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._counters['hits'] += 1
+                    return probabilities
+                del self._entries[key]
+
+        probabilities = self.store.get(key) if self.store is not None else None
+        with self._lock:
+            if probabilities is None:
+                self._counters['misses'] += 1
+                return None
+            self._counters['shared_hits'] += 1
+        self._put_local(key, probabilities, now)
+        return probabilities
+
+    def put(self, model_version, digest: bytes, prediction_probabilities: np.ndarray) -> None:
+        """
+        Cache the probabilities of an image for a model version.
+
+        Args:
+            model_version: Version of the model that made the prediction
+            digest: image_hash() of the image
+            prediction_probabilities: Full probability distribution
+        """
+        key = self._key(model_version, digest)
+        self._put_local(key, prediction_probabilities, time.monotonic())
+        if self.store is not None:
+            self.store.put(key, prediction_probabilities)
+
+    def _put_local(self, key, prediction_probabilities, now):
+        with self._lock:
+            self._entries[key] = (prediction_probabilities, now + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._counters['evictions'] += 1
+
+    def stats(self) -> dict:
+        """
+        Return the cache metrics.
+
+        Returns:
+            dict: Hits (local and from the shared store), misses, evictions,
+                hit rate and current size
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            stats['size'] = len(self._entries)
+        lookups = stats['hits'] + stats['shared_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['hits'] + stats['shared_hits']) / lookups if lookups else 0.0
+        return stats
+
+
+def create_prediction_cache(
+    max_size: int = PREDICTION_CACHE_SIZE,
+    ttl: float = PREDICTION_CACHE_TTL,
+    path: str = PREDICTION_CACHE_PATH
+) -> Optional[PredictionCache]:
+    """
+    Create the prediction cache configured through the environment.
+
+    Args:
+        max_size: Maximum number of entries held in this process (0 disables caching)
+        ttl: Seconds an entry stays valid
+        path: Optional SQLite file shared between worker processes
+
+    Returns:
+        PredictionCache or None: The cache, or None if caching is disabled
+    """
+    if max_size <= 0:
+        return None
+    store = SharedCacheStore(path, ttl) if path else None
+    return PredictionCache(max_size=max_size, ttl=ttl, store=store)
@@ -0,0 +1,162 @@
+"""In-process prediction service shared by the serving endpoints."""
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from .db_helper import insert_input_and_prediction, insert_inputs_and_predictions_batch
+from .prediction_cache import image_hash
+from .metrics import BATCH_SIZE, CACHE_LOOKUPS, stage_timer
+
+
+class PredictionService:
+    """
+    Run inference on preprocessed images and persist the results.
+
+    Every endpoint that predicts (the JSON API, batch API and the upload
+    page) calls this service directly, so an image is decoded once and
+    never re-encoded or sent back through HTTP to the same process.
+
+    Repeated images are answered from an optional content-hash cache and
+    can optionally share one input_data row.
+    """
+
+    def __init__(self, batcher, db_pool, write_queue=None, cache=None, dedupe_inputs=False):
+        """
+        Args:
+            batcher: Started BatchingPredictor in front of the model
+            db_pool: Database connection or ConnectionPool
+            write_queue: Optional WriteBehindQueue. If given, single predictions
+                are persisted in the background and returned without IDs
+            cache: Optional PredictionCache consulted before running the model
+            dedupe_inputs: Whether identical images reuse one input_data row
+        """
+        self.batcher = batcher
+        self.db_pool = db_pool
+        self.write_queue = write_queue
+        self.cache = cache
+        self.dedupe_inputs = dedupe_inputs
+
+    def predict(self, image_array: np.ndarray, true_label: int = -1) -> dict:
+        """
+        Predict one image and store it with its prediction.
+
+        Args:
+            image_array: Preprocessed image of shape (28, 28, 1)
+            true_label: The true label of the image (-1 if unknown)
+
+        Returns:
+            dict: Prediction, confidence, probabilities, database IDs and model version
+        """
+        digest = image_hash(image_array) if self.cache is not None or self.dedupe_inputs else None
+
+        prediction_probs = None
+        if self.cache is not None:
+            model_version = self.batcher.model_version
+            prediction_probs = self.cache.get(model_version, digest)
+            CACHE_LOOKUPS.labels('miss' if prediction_probs is None else 'hit').inc()
+        if prediction_probs is None:
+            with stage_timer('inference'):
+                prediction_probs, model_version = self.batcher.predict_versioned(image_array)
+            if self.cache is not None:
+                self.cache.put(model_version, digest, prediction_probs)
+
+        predicted_label = int(prediction_probs.argmax())
+        confidence = float(prediction_probs.max())
+        stored_hash = digest if self.dedupe_inputs else None
+
+        if self.write_queue is not None:
+            # IDs are assigned later by the background writer
+            self.write_queue.submit(
+                image_array, int(true_label), prediction_probs, model_version, stored_hash
+            )
+            input_data_id, prediction_id = None, None
+        else:
+            with stage_timer('db_insert'):
+                input_data_id, prediction_id = insert_input_and_prediction(
+                    self.db_pool,
+                    image_array,
+                    int(true_label),
+                    predicted_label=predicted_label,
+                    confidence=confidence,
+                    prediction_probabilities=prediction_probs,
+                    model_version=model_version,
+                    image_hash=stored_hash
+                )
+
+        return {
+            'prediction': predicted_label,
+            'confidence': confidence,
+            'probabilities': prediction_probs.tolist(),
+            'input_data_id': input_data_id,
+            'prediction_id': prediction_id,
+            'model_version': model_version
+        }
+
+    def predict_batch(
+        self,
+        image_arrays: Sequence[np.ndarray],
+        true_labels: Optional[Sequence[int]] = None
+    ) -> List[dict]:
+        """
+        Predict many images in one forward pass and store them in one transaction.
+
+        Args:
+            image_arrays: Preprocessed images of shape (28, 28, 1)
+            true_labels: Optional true labels (-1 if unknown)
+
+        Returns:
+            list: One result dict per image, as returned by predict()
+        """
+        if len(image_arrays) == 0:
+            return []
+        if true_labels is None:
+            true_labels = [-1] * len(image_arrays)
+
+        image_arrays = np.asarray(image_arrays, dtype=np.float32)
+        digests = None
+        if self.cache is not None or self.dedupe_inputs:
+            digests = [image_hash(image_array) for image_array in image_arrays]
+
+        # A consistent snapshot of the model in case it is hot-swapped meanwhile
+        model, model_version = self.batcher.active
+        probabilities = [None] * len(image_arrays)
+        if self.cache is not None:
+            probabilities = [self.cache.get(model_version, digest) for digest in digests]
+        misses = [index for index, probs in enumerate(probabilities) if probs is None]
+        if self.cache is not None:
+            CACHE_LOOKUPS.labels('hit').inc(len(image_arrays) - len(misses))
+            CACHE_LOOKUPS.labels('miss').inc(len(misses))
+
+        # One vectorized forward pass over the images that are not cached
+        BATCH_SIZE.labels('request').observe(len(image_arrays))
+        if misses:
+            with stage_timer('inference'):
+                computed = model.predict(image_arrays[misses], verbose=0)
+            for index, probs in zip(misses, computed):
+                probabilities[index] = probs
+                if self.cache is not None:
+                    self.cache.put(model_version, digests[index], probs)
+        prediction_probs = np.stack(probabilities)
+
+        with stage_timer('db_batch_insert'):
+            input_data_ids, prediction_ids = insert_inputs_and_predictions_batch(
+                self.db_pool,
+                image_arrays,
+                true_labels,
+                prediction_probs,
+                model_version=model_version,
+                image_hashes=digests if self.dedupe_inputs else None
+            )
+
+        return [
+            {
+                'prediction': int(probs.argmax()),
+                'confidence': float(probs.max()),
+                'probabilities': probs.tolist(),
+                'input_data_id': input_data_id,
+                'prediction_id': prediction_id,
+                'model_version': model_version
+            }
+            for probs, input_data_id, prediction_id
+            in zip(prediction_probs, input_data_ids, prediction_ids)
+        ]
@@ -0,0 +1,145 @@
+"""Post-training int8 quantization with an accuracy gate."""
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+
+from .model_io import export_tflite
+from .predict import TFLiteBackend
+
+
+def evaluate_accuracy(model, x, y, batch_size=1024):
+    """
+    Compute the classification accuracy of a model or inference backend.
+
+    Args:
+        model: Object exposing predict(x, verbose=0)
+        x: Input samples
+        y: Labels, either class indices or one-hot encoded
+        batch_size: Number of samples per forward pass
+
+    Returns:
+        float: Fraction of correctly classified samples
+    """
+    labels = y.argmax(axis=1) if y.ndim == 2 else y
+    correct = 0
+    for start in range(0, len(x), batch_size):
+        probs = model.predict(x[start:start + batch_size], verbose=0)
+        correct += int((probs.argmax(axis=1) == labels[start:start + batch_size]).sum())
+    return correct / len(x)
+
+
+def measure_latency(model, x, batch_size, repeats=50):
+    """
+    Measure the median latency of one forward pass.
+
+    Args:
+        model: Object exposing predict(x, verbose=0)
+        x: Input samples to draw the batch from
+        batch_size: Number of samples per forward pass
+        repeats: Number of timed forward passes
+
+    Returns:
+        float: Median latency in milliseconds
+    """
+    batch = x[:batch_size]
+    model.predict(batch, verbose=0)  # Warm-up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict(batch, verbose=0)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1000)
+
+
+def quantize_with_accuracy_gate(
+    model,
+    calibration_data,
+    x_test,
+    y_test,
+    output_path,
+    max_accuracy_drop=0.01,
+    float_model_path=None,
+    batch_size=256
+):
+    """
+    Quantize a model to int8 and publish it only if accuracy holds up.
+
+    The int8 TFLite model is calibrated on calibration_data, evaluated on
+    the test set and compared against the float model. It is written to
+    output_path only if the accuracy drop does not exceed max_accuracy_drop.
+
+    Args:
+        model: The float Keras model
+        calibration_data: Sample inputs for int8 calibration
+        x_test: Test images
+        y_test: Test labels (class indices or one-hot)
+        output_path: Where to publish the int8 .tflite model
+        max_accuracy_drop: Largest tolerated accuracy loss (absolute, e.g. 0.01)
+        float_model_path: Optional saved float model, used to report its size
+        batch_size: Batch size for the batched latency measurement
+
+    Returns:
+        dict: Report with accuracies, accuracy delta, model sizes, latencies
+            and whether the model was published
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        candidate_path = os.path.join(tmp_dir, 'candidate.tflite')
+        export_tflite(
+            model,
+            filepath=candidate_path,
+            quantization='int8',
+            representative_data=calibration_data
+        )
+        quantized = TFLiteBackend(candidate_path)
+
+        float_accuracy = evaluate_accuracy(model, x_test, y_test)
+        int8_accuracy = evaluate_accuracy(quantized, x_test, y_test)
+        accuracy_delta = int8_accuracy - float_accuracy
+
+        report = {
+            'float_accuracy': float_accuracy,
+            'int8_accuracy': int8_accuracy,
+            'accuracy_delta': accuracy_delta,
+            'max_accuracy_drop': max_accuracy_drop,
+            'float_size_bytes': os.path.getsize(float_model_path) if float_model_path else None,
+            'int8_size_bytes': os.path.getsize(candidate_path),
+            'float_latency_ms': {
+                'single': measure_latency(model, x_test, 1),
+                'batched': measure_latency(model, x_test, batch_size)
+            },
+            'int8_latency_ms': {
+                'single': measure_latency(quantized, x_test, 1),
+                'batched': measure_latency(quantized, x_test, batch_size)
+            },
+            'batch_size': batch_size,
+            'published': False
+        }
+
+        if -accuracy_delta <= max_accuracy_drop:
+            os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+            shutil.copyfile(candidate_path, output_path)
+            report['published'] = True
+            report['output_path'] = output_path
+
+    return report
+
+
+def print_quantization_report(report):
+    """Print a quantization report in a readable form."""
+    print(f"  Float accuracy:  {report['float_accuracy']:.4f}")
+    print(f"  Int8 accuracy:   {report['int8_accuracy']:.4f} "
+          f"(delta {report['accuracy_delta']:+.4f}, allowed drop {report['max_accuracy_drop']:.4f})")
+    if report['float_size_bytes']:
+        print(f"  Float size:      {report['float_size_bytes'] / 1024:.1f} KiB")
+    print(f"  Int8 size:       {report['int8_size_bytes'] / 1024:.1f} KiB")
+    print(f"  Latency single:  float {report['float_latency_ms']['single']:.3f} ms, "
+          f"int8 {report['int8_latency_ms']['single']:.3f} ms")
+    print(f"  Latency batch {report['batch_size']}: "
+          f"float {report['float_latency_ms']['batched']:.3f} ms, "
+          f"int8 {report['int8_latency_ms']['batched']:.3f} ms")
+    if report['published']:
+        print(f"  Published int8 model to {report['output_path']}")
+    else:
+        print("  Accuracy gate failed: int8 model NOT published")
@@ -0,0 +1,92 @@
+"""
+Early stopping of losing sweep trials with asynchronous successive halving (ASHA).
+
+Trials report their validation accuracy at epoch boundaries. At each rung
+(min_epochs, min_epochs * eta, min_epochs * eta^2, ... epochs) a trial only
+keeps training if it is in the top 1/eta of the trials that reached that
+rung so far; otherwise it is stopped and its worker moves on to the next
+trial. Decisions never wait for other trials, so workers stay busy.
+"""
+import threading
+
+import numpy as np
+
+
+class AshaScheduler:
+    """
+    Asynchronous successive halving over epochs.
+
+    The rung results live in a plain dict by default. share() moves them to
+    a multiprocessing manager so trials in several worker processes (see
+    sweep.run_sweep) rank against each other.
+    """
+
+    def __init__(self, eta=3, min_epochs=1, max_epochs=5, metric='val_accuracy'):
+        """
+        Args:
+            eta: Reduction factor; roughly 1/eta of the trials survive each rung
+            min_epochs: Epochs every trial trains before its first evaluation
+            max_epochs: Epochs a trial that survives every rung trains for
+            metric: Epoch metric to rank by (higher is better)
+        """
+        if eta < 2 or min_epochs < 1 or max_epochs < min_epochs:
+            raise ValueError(f"Invalid ASHA settings: eta={eta}, min_epochs={min_epochs}, "
+                             f"max_epochs={max_epochs}")
+        self.eta = eta
+        self.min_epochs = min_epochs
+        self.max_epochs = max_epochs
+        self.metric = metric
+
+        self.rungs = []
+        epoch = min_epochs
+        while epoch < max_epochs:
+            self.rungs.append(epoch)
+            epoch *= eta
+
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def share(self, manager):
+        """
+        Keep the rung results in a multiprocessing manager.
+
+        Args:
+            manager: Started multiprocessing manager (e.g. context.Manager())
+        """
+        self._results = manager.dict(dict(self._results))
+        self._lock = manager.Lock()
+
+    def report(self, trial_id, epoch, value):
+        """
+        Record a trial's metric after an epoch and decide whether it continues.
+
+        Args:
+            trial_id: Identifier of the trial
+            epoch: Number of epochs completed (1-based)
+            value: Metric value after that epoch, or None if unavailable
+
+        Returns:
+            bool: True if the trial should keep training
+        """
+        if epoch >= self.max_epochs:
+            return False
+        if epoch not in self.rungs or value is None:
+            return True
+
+        with self._lock:
+            recorded = dict(self._results.get(epoch, {}))
+            recorded[trial_id] = float(value)
+            # Manager dicts only see assignments, not in-place updates
+            self._results[epoch] = recorded
+
+        cutoff = np.percentile(list(recorded.values()), (1 - 1 / self.eta) * 100)
+        return bool(value >= cutoff)
+
+    def summary(self):
+        """
+        Return how many trials reached each rung.
+
+        Returns:
+            dict: Rung epoch -> number of trials evaluated there
+        """
+        return {epoch: len(self._results.get(epoch, {})) for epoch in self.rungs}
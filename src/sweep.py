@@ -0,0 +1,486 @@
+"""
+Local hyperparameter sweeps: run train_model() configs in parallel processes.
+
+Each worker process is pinned to its own slice of the CPU cores and sizes
+TensorFlow's thread pools to that slice, so concurrent trials do not fight
+over the same cores. All workers memory-map the same preprocessed dataset
+cache (see load_data), which the runner builds once before starting them.
+
+An optional AshaScheduler (see scheduler.py) stops losing trials at epoch
+boundaries and spends the freed epochs on the promising ones.
+
+TensorFlow is only imported inside the workers, after their thread
+settings are in place.
+"""
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import queue
+import random
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+# Parameters of train_model() a search space may set
+TRAIN_PARAMS = (
+    'epochs',
+    'batch_size',
+    'optimizer',
+    'learning_rate',
+    'extra_layer',
+    'dropout_rate',
+    'shuffle_buffer',
+    'augment',
+    'sparse_labels'
+)
+
+# train_model's default, used when a config does not set epochs
+DEFAULT_EPOCHS = 5
+
+# Seconds a starting worker waits for its CPU slice
+CPU_SLICE_TIMEOUT = 30
+
+# CPU slice of this worker process (set by _init_worker)
+_worker_cpus = None
+
+
+class Uniform:
+    """Continuous range for random search, optionally sampled on a log scale."""
+
+    def __init__(self, low, high, log=False):
+        """
+        Args:
+            low: Lower bound
+            high: Upper bound
+            log: Whether to sample uniformly in log space (e.g. learning rates)
+        """
+        if low >= high or (log and low <= 0):
+            raise ValueError(f"Invalid range: [{low}, {high}]")
+        self.low = low
+        self.high = high
+        self.log = log
+
+    def sample(self, rng):
+        """Draw one value using the random.Random instance rng."""
+        if self.log:
+            return float(10 ** rng.uniform(math.log10(self.low), math.log10(self.high)))
+        return rng.uniform(self.low, self.high)
+
+    def __repr__(self):
+        return f"Uniform({self.low}, {self.high}, log={self.log})"
+
+
+def _check_space(space):
+    unknown = set(space) - set(TRAIN_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown train_model parameters: {sorted(unknown)}")
+
+
+def grid_search(space):
+    """
+    Expand a search space into every combination of its values.
+
+    Args:
+        space: Dict mapping train_model parameter names to lists of values
+
+    Returns:
+        list: Config dicts, one per combination
+
+    Raises:
+        ValueError: On unknown parameters or continuous ranges
+    """
+    _check_space(space)
+    names = list(space)
+    for name in names:
+        if isinstance(space[name], Uniform):
+            raise ValueError(f"Grid search needs a list of values for '{name}'")
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+
+def random_search(space, num_trials, seed=None):
+    """
+    Sample configs from a search space.
+
+    Args:
+        space: Dict mapping train_model parameter names to lists of values
+            (sampled uniformly) or Uniform ranges
+        num_trials: Number of configs to draw
+        seed: Optional random seed
+
+    Returns:
+        list: num_trials config dicts
+    """
+    _check_space(space)
+    rng = random.Random(seed)
+    configs = []
+    for _ in range(num_trials):
+        configs.append({
+            name: values.sample(rng) if isinstance(values, Uniform) else rng.choice(values)
+            for name, values in space.items()
+        })
+    return configs
+
+
+def available_cpus():
+    """Return the cores this process may run on."""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def cpu_slices(num_workers, cpus=None):
+    """
+    Split the available cores into contiguous, disjoint slices.
+
+    Args:
+        num_workers: Number of slices
+        cpus: Cores to split. If None, uses available_cpus()
+
+    Returns:
+        list: One list of core ids per worker (at least one core each)
+    """
+    cpus = available_cpus() if cpus is None else list(cpus)
+    num_workers = max(1, min(num_workers, len(cpus)))
+    size, extra = divmod(len(cpus), num_workers)
+    slices, start = [], 0
+    for index in range(num_workers):
+        end = start + size + (1 if index < extra else 0)
+        slices.append(cpus[start:end])
+        start = end
+    return slices
+
+
+def _init_worker(cpu_queue):
+    """Pin this worker to a CPU slice and size the thread pools to it (before TensorFlow loads)."""
+    global _worker_cpus
+    try:
+        # The queue is filled by a feeder thread, so the slice may not be there yet
+        _worker_cpus = cpu_queue.get(timeout=CPU_SLICE_TIMEOUT)
+    except queue.Empty:
+        # Only a replacement worker after a crash finds no slice left
+        _worker_cpus = available_cpus()
+        print(f"Worker {os.getpid()} got no CPU slice; running unpinned on {len(_worker_cpus)} cores")
+
+    if hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, _worker_cpus)
+
+    threads = str(len(_worker_cpus))
+    for name in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ[name] = threads
+    os.environ['INTRA_OP_THREADS'] = threads
+    os.environ['INTER_OP_THREADS'] = '1'
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+    from .predict import configure_threads
+    configure_threads(backend='keras', intra_op_threads=len(_worker_cpus), inter_op_threads=1)
+
+
+def _epoch_recorder(epochs):
+    """Keras callback appending each epoch's metrics and duration to epochs."""
+    from tensorflow import keras
+
+    state = {}
+
+    def on_epoch_begin(epoch, logs=None):
+        state['start'] = time.perf_counter()
+
+    def on_epoch_end(epoch, logs=None):
+        record = {'epoch': epoch + 1, 'seconds': round(time.perf_counter() - state['start'], 3)}
+        record.update({name: float(value) for name, value in (logs or {}).items()})
+        epochs.append(record)
+
+    return keras.callbacks.LambdaCallback(on_epoch_begin=on_epoch_begin, on_epoch_end=on_epoch_end)
+
+
+def _wandb_logger(run):
+    """Keras callback logging each epoch's metrics to a W&B run."""
+    from tensorflow import keras
+
+    def on_epoch_end(epoch, logs=None):
+        if logs:
+            run.log({'epoch': epoch + 1, **logs})
+
+    return keras.callbacks.LambdaCallback(on_epoch_end=on_epoch_end)
+
+
+def _pruning_callback(scheduler, trial_id, result):
+    """Keras callback reporting each epoch to the scheduler and stopping the trial when told to."""
+    from tensorflow import keras
+
+    def on_epoch_end(epoch, logs=None):
+        epochs_done = epoch + 1
+        value = (logs or {}).get(scheduler.metric)
+        if not scheduler.report(trial_id, epochs_done, value) and epochs_done < scheduler.max_epochs:
+            result['pruned_at'] = epochs_done
+            # Keras attaches the model to the callback before training starts
+            callback.model.stop_training = True
+
+    callback = keras.callbacks.LambdaCallback(on_epoch_end=on_epoch_end)
+    return callback
+
+
+def run_trial(trial_id, config, wandb_project=None, model_dir=None, scheduler=None):
+    """
+    Train one config in this process.
+
+    Args:
+        trial_id: Identifier of the trial
+        config: train_model keyword arguments
+        wandb_project: W&B project to log to, or None to skip W&B
+        model_dir: Directory to save the trained model in, or None to skip saving
+        scheduler: Optional AshaScheduler. The trial then trains for up to
+            scheduler.max_epochs and stops early when the scheduler prunes it
+
+    Returns:
+        dict: Trial result with its per-epoch metrics and final val_accuracy
+    """
+    from tensorflow import keras
+    from .train_model import train_model
+    from .model_io import save_model
+
+    # Trials reuse the worker process; start each from a clean graph
+    keras.backend.clear_session()
+
+    result = {
+        'trial_id': trial_id,
+        'config': config,
+        'cpus': _worker_cpus,
+        'pid': os.getpid(),
+        'epochs': []
+    }
+    callbacks = [_epoch_recorder(result['epochs'])]
+    train_config = dict(config)
+    if scheduler is not None:
+        train_config['epochs'] = scheduler.max_epochs
+        callbacks.append(_pruning_callback(scheduler, trial_id, result))
+
+    run = None
+    if wandb_project:
+        import wandb
+        wandb.login(key=os.getenv('WANDB_TOKEN'))
+        run = wandb.init(project=wandb_project, config=config, name=trial_id, reinit=True)
+        callbacks.append(_wandb_logger(run))
+
+    start = time.perf_counter()
+    try:
+        model = train_model(callbacks=callbacks, **train_config)
+        if 'pruned_at' in result:
+            result['status'] = 'pruned'
+        else:
+            if model_dir:
+                result['model_path'] = os.path.join(model_dir, f"mnist_model_{trial_id}.keras")
+                save_model(model, filepath=result['model_path'])
+            result['status'] = 'completed'
+    except Exception as e:
+        result['status'] = 'failed'
+        result['error'] = f"{type(e).__name__}: {e}"
+        traceback.print_exc()
+    finally:
+        if run is not None:
+            run.finish()
+
+    result['seconds'] = round(time.perf_counter() - start, 3)
+    result['val_accuracy'] = result['epochs'][-1].get('val_accuracy') if result['epochs'] else None
+    return result
+
+
+class JsonlSink:
+    """Append-only JSON Lines file with one record per finished trial."""
+
+    def __init__(self, path):
+        """
+        Args:
+            path: File to append to (created with its directory if needed)
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def write(self, record):
+        """Append one record, so an interrupted sweep keeps the results it has."""
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record, default=str) + '\n')
+
+
+def estimate_savings(results, elapsed):
+    """
+    Compare a pruned sweep with training every config for its full epochs.
+
+    A pruned trial's remaining epochs are extrapolated from its mean epoch
+    time. The exhaustive sweep's wall-clock time is estimated by assuming
+    it would have run with the same parallel efficiency as this one.
+
+    Args:
+        results: Trial results of the sweep (trials marked 'extra' were
+            funded by pruning and are not part of the exhaustive grid)
+        elapsed: Wall-clock seconds the sweep took
+
+    Returns:
+        dict: Trial and epoch counts, wall-clock time of the sweep and the
+            estimated exhaustive time, and the seconds and fraction saved
+    """
+    actual_seconds = sum(result.get('seconds', 0.0) for result in results)
+    exhaustive_seconds = 0.0
+    exhaustive_epochs = 0
+    for result in results:
+        if result.get('extra'):
+            continue
+        full_epochs = result['config'].get('epochs', DEFAULT_EPOCHS)
+        exhaustive_epochs += full_epochs
+        epoch_seconds = [epoch['seconds'] for epoch in result.get('epochs', [])]
+        if not epoch_seconds:
+            exhaustive_seconds += result.get('seconds', 0.0)
+            continue
+        overhead = result['seconds'] - sum(epoch_seconds)
+        exhaustive_seconds += overhead + full_epochs * sum(epoch_seconds) / len(epoch_seconds)
+
+    exhaustive_wall = elapsed * exhaustive_seconds / actual_seconds if actual_seconds else elapsed
+    return {
+        'trials': len(results),
+        'pruned': sum(result.get('status') == 'pruned' for result in results),
+        'extra_trials': sum(bool(result.get('extra')) for result in results),
+        'epochs_trained': sum(len(result.get('epochs', [])) for result in results),
+        'exhaustive_epochs': exhaustive_epochs,
+        'wall_seconds': round(elapsed, 1),
+        'exhaustive_wall_seconds': round(exhaustive_wall, 1),
+        'saved_seconds': round(exhaustive_wall - elapsed, 1),
+        'saved_fraction': round(1 - elapsed / exhaustive_wall, 3) if exhaustive_wall > 0 else 0.0
+    }
+
+
+def run_sweep(
+    configs,
+    num_workers=2,
+    results_path='sweep_results.jsonl',
+    wandb_project=None,
+    model_dir=None,
+    sweep_id=None,
+    scheduler=None,
+    extra_configs=None
+):
+    """
+    Run configs in parallel worker processes, each pinned to its own CPU slice.
+
+    With a scheduler, losing trials are stopped at its rungs, and the
+    epochs they free go to the survivors (which train for up to
+    scheduler.max_epochs) and to extra configs. An extra config is started
+    whenever the epochs trained so far, plus the worst case of the running
+    trials, leave room for one more full trial within the exhaustive
+    budget (every config trained for its own epochs).
+
+    Args:
+        configs: train_model keyword argument dicts (see grid_search, random_search)
+        num_workers: Number of concurrent trials (capped at the number of cores)
+        results_path: JSONL file receiving one record per finished trial
+        wandb_project: W&B project to log each trial to, or None for local results only
+        model_dir: Directory to save trained models in, or None to skip saving
+        sweep_id: Prefix of the trial ids (default: a timestamp)
+        scheduler: Optional AshaScheduler for early stopping
+        extra_configs: Optional iterator of further configs to fund with the
+            epochs saved by the scheduler
+
+    Returns:
+        list: Trial results sorted by val_accuracy, best first
+    """
+    from .load_data import load_mnist_raw
+
+    sweep_id = sweep_id or time.strftime('%Y%m%d-%H%M%S')
+    slices = cpu_slices(num_workers)
+    if model_dir:
+        os.makedirs(model_dir, exist_ok=True)
+    sink = JsonlSink(results_path)
+
+    # Build the memory-mapped dataset cache once; workers map the same files
+    load_mnist_raw()
+
+    # Workers must start fresh interpreters to apply their thread settings before TensorFlow loads
+    context = multiprocessing.get_context('spawn')
+    cpu_queue = context.Queue()
+    for cpus in slices:
+        cpu_queue.put(cpus)
+
+    manager = None
+    if scheduler is not None:
+        # Rung results are shared by all workers
+        manager = context.Manager()
+        scheduler.share(manager)
+    if scheduler is None or extra_configs is None:
+        extra_configs = iter(())
+
+    budget = sum(config.get('epochs', DEFAULT_EPOCHS) for config in configs)
+    trial_epochs = scheduler.max_epochs if scheduler is not None else None
+
+    print(f"Sweep {sweep_id}: {len(configs)} trials on {len(slices)} workers "
+          f"({', '.join(str(len(cpus)) for cpus in slices)} cores each)")
+
+    results = []
+    pending = {}
+    committed = 0
+    start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(
+            max_workers=len(slices),
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(cpu_queue,)
+        ) as executor:
+
+            def submit(config, extra=False):
+                nonlocal committed
+                trial_id = f"{sweep_id}-{len(results) + len(pending)}"
+                future = executor.submit(run_trial, trial_id, config, wandb_project, model_dir, scheduler)
+                pending[future] = (config, extra)
+                committed += trial_epochs or config.get('epochs', DEFAULT_EPOCHS)
+
+            for config in configs:
+                submit(config)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    config, extra = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        # The worker process died (e.g. out of memory)
+                        result = {'config': config, 'status': 'failed', 'error': f"{type(e).__name__}: {e}"}
+                    result['sweep_id'] = sweep_id
+                    if extra:
+                        result['extra'] = True
+                    sink.write(result)
+                    results.append(result)
+                    # Replace the worst case with the epochs actually trained
+                    committed -= (trial_epochs or config.get('epochs', DEFAULT_EPOCHS)) - len(result.get('epochs', []))
+                    print(f"[{len(results)}/{len(results) + len(pending)}] {result.get('trial_id', '?')} "
+                          f"{result['status']} val_accuracy={result.get('val_accuracy')} config={result['config']}")
+
+                while trial_epochs is not None and budget - committed >= trial_epochs:
+                    config = next(extra_configs, None)
+                    if config is None:
+                        break
+                    submit(config, extra=True)
+
+        rung_counts = scheduler.summary() if scheduler is not None else None
+    finally:
+        if manager is not None:
+            manager.shutdown()
+
+    elapsed = time.perf_counter() - start
+    trial_seconds = sum(result.get('seconds', 0) for result in results)
+    print(f"Sweep finished in {elapsed:.1f}s wall-clock ({trial_seconds:.1f}s of training, "
+          f"{trial_seconds / max(elapsed, 1e-9):.1f}x parallel speed-up)")
+
+    if scheduler is not None:
+        savings = estimate_savings(results, elapsed)
+        sink.write({'sweep_id': sweep_id, 'summary': savings, 'rungs': rung_counts})
+        print(f"Pruned {savings['pruned']} of {savings['trials']} trials "
+              f"({savings['extra_trials']} extra), trained {savings['epochs_trained']} epochs "
+              f"instead of {savings['exhaustive_epochs']}")
+        print(f"Exhaustive grid: ~{savings['exhaustive_wall_seconds']:.1f}s wall-clock, "
+              f"saved ~{savings['saved_seconds']:.1f}s ({savings['saved_fraction']:.0%})")
+
+    results.sort(key=lambda result: result.get('val_accuracy') or 0.0, reverse=True)
+    return results
@@ -1,5 +1,5 @@
 """Model training module for MNIST dataset."""
-from .load_data import load_mnist_data
+from .load_data import load_mnist_datasets, SHUFFLE_BUFFER
 from .create_model import create_model
 from tensorflow.keras.optimizers import Adam, SGD
 
@@ -10,7 +10,10 @@ def train_model(
     learning_rate=0.001,
     extra_layer=False,
     dropout_rate=0.5,
-    callbacks=None
+    callbacks=None,
+    shuffle_buffer=SHUFFLE_BUFFER,
+    augment=False,
+    sparse_labels=False
 ):
     """
     Train a CNN model on the MNIST dataset with configurable hyperparameters.
@@ -23,19 +26,30 @@ def train_model(
         extra_layer (bool): Whether to add an extra dense layer in the model.
         dropout_rate (float): Dropout rate for the Dropout layer.
         callbacks (list): List of Keras callbacks.
+        shuffle_buffer (int): Size of the bounded shuffle buffer of the input pipeline.
+        augment (bool): Whether to apply random rotations and shifts to training batches.
+        sparse_labels (bool): Whether to train on integer labels with sparse categorical
+            cross-entropy instead of one-hot labels.
 
     Returns:
-        keras.Model: Trained Keras model.
+        keras.Model: Trained Keras model. Its test-set loss and accuracy are
+        available as model.test_loss and model.test_accuracy.
     """
 
-    # Load MNIST data
-    (x_train, y_train), (x_test, y_test) = load_mnist_data()
+    # Stream MNIST through tf.data (uint8 storage, normalized per batch)
+    train_dataset, validation_dataset, test_dataset = load_mnist_datasets(
+        batch_size=batch_size,
+        shuffle_buffer=shuffle_buffer,
+        augment=augment,
+        sparse_labels=sparse_labels
+    )
 
     # Pass optimizer as string and learning rate to create_model
     model = create_model(
         extra_layer=extra_layer,
         optimizer=optimizer,
-        dropout_rate=dropout_rate
+        dropout_rate=dropout_rate,
+        sparse_labels=sparse_labels
     )
 
     # Override optimizer learning rate if needed
@@ -46,15 +60,18 @@ def train_model(
 
     # Train the model
     model.fit(
-        x_train, y_train,
-        batch_size=batch_size,
+        train_dataset,
         epochs=epochs,
-        validation_split=0.1,
+        validation_data=validation_dataset,
         callbacks=callbacks
     )
 
     # Evaluate the model
-    test_loss, test_acc = model.evaluate(x_test, y_test, verbose=2)
+    test_loss, test_acc = model.evaluate(test_dataset, verbose=2)
     print(f"\nTest accuracy: {test_acc:.4f}")
 
+    # Kept on the model so callers need not reload and re-evaluate the test set
+    model.test_loss = float(test_loss)
+    model.test_accuracy = float(test_acc)
+
     return model
@@ -0,0 +1,212 @@
+"""Asynchronous write-behind queue for logging predictions to PostgreSQL."""
+import logging
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+from .db_helper import insert_inputs_and_predictions_batch
+from .metrics import BATCH_SIZE, QUEUE_DEPTH, stage_timer
+
+logger = logging.getLogger(__name__)
+
+# Write-behind parameters (overridable through the environment)
+WRITE_QUEUE_SIZE = int(os.getenv('WRITE_QUEUE_SIZE', '10000'))
+WRITE_BATCH_SIZE = int(os.getenv('WRITE_BATCH_SIZE', '256'))
+WRITE_FLUSH_INTERVAL_MS = float(os.getenv('WRITE_FLUSH_INTERVAL_MS', '200'))
+WRITE_ENQUEUE_TIMEOUT_MS = float(os.getenv('WRITE_ENQUEUE_TIMEOUT_MS', '50'))
+
+
+class WriteBehindQueue:
+    """
+    Bounded in-process queue that persists predictions in the background.
+
+    Request handlers submit (image, true_label, probabilities) records and
+    return immediately. A worker thread drains the queue and writes up to
+    batch_size records per transaction with execute_values. When the queue
+    is full, submit() blocks for at most enqueue_timeout_ms (backpressure)
+    and then drops the record, which is counted in the metrics.
+    """
+
+    def __init__(
+        self,
+        conn,
+        max_queue_size=WRITE_QUEUE_SIZE,
+        batch_size=WRITE_BATCH_SIZE,
+        flush_interval_ms=WRITE_FLUSH_INTERVAL_MS,
+        enqueue_timeout_ms=WRITE_ENQUEUE_TIMEOUT_MS
+    ):
+        """
+        Args:
+            conn: Database connection or ConnectionPool used by the worker
+            max_queue_size (int): Maximum number of pending records
+            batch_size (int): Maximum number of records written per transaction
+            flush_interval_ms (float): Maximum time a record waits before a flush
+            enqueue_timeout_ms (float): Time submit() blocks on a full queue
+        """
+        self.conn = conn
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.enqueue_timeout = enqueue_timeout_ms / 1000.0
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._queue_depth = QUEUE_DEPTH.labels('write_behind')
+        self._thread = None
+        self._lock = threading.Lock()
+        self._counters = {
+            'enqueued': 0,
+            'written': 0,
+            'dropped': 0,
+            'failed': 0,
+            'batches': 0
+        }
+
+    def start(self):
+        """Start the background flush thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(
+            target=self._run,
+            name='write-behind',
+            daemon=True
+        )
+        self._thread.start()
+
+    def close(self, timeout=None):
+        """
+        Flush all pending records and stop the background thread.
+
+        Args:
+            timeout: Optional number of seconds to wait for the flush
+        """
+        if self._thread is None:
+            return
+        # Blocks until the worker has made room for the sentinel
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def submit(
+        self,
+        image_array: np.ndarray,
+        true_label: int,
+        prediction_probabilities: np.ndarray,
+        model_version=None,
+        image_hash=None
+    ) -> bool:
+        """
+        Queue an input and its prediction for persistence.
+
+        Args:
+            image_array: Numpy array of the image
+            true_label: The true label of the image (-1 if unknown)
+            prediction_probabilities: Full probability distribution
+            model_version: Optional version of the model that made the prediction
+            image_hash: Optional content hash; if given, the input is deduplicated
+
+        Returns:
+            bool: True if the record was queued, False if it was dropped
+        """
+        record = (image_array, int(true_label), prediction_probabilities, model_version, image_hash)
+        try:
+            self._queue.put(record, timeout=self.enqueue_timeout)
+        except queue.Full:
+            self._increment('dropped')
+            return False
+        # Updated on both ends so a stalled writer shows up as a growing queue
+        self._queue_depth.set(self._queue.qsize())
+        self._increment('enqueued')
+        return True
+
+    def stats(self) -> dict:
+        """
+        Return the current queue metrics.
+
+        Returns:
+            dict: Queue depth and counters of enqueued, written, dropped
+                and failed records
+        """
+        with self._lock:
+            stats = dict(self._counters)
+        stats['queue_depth'] = self._queue.qsize()
+        return stats
+
+    def _increment(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def _collect_batch(self, first_record):
+        """Collect records until the batch is full or the flush interval expires."""
+        batch = [first_record]
+        deadline = time.monotonic() + self.flush_interval
+        stop = False
+
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                record = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if record is None:
+                stop = True
+                break
+            batch.append(record)
+
+        return batch, stop
+
+    def _flush(self, batch):
+        """Write a batch of records, one transaction per model version."""
+        self._queue_depth.set(self._queue.qsize())
+        by_version = {}
+        for record in batch:
+            by_version.setdefault(record[3], []).append(record)
+
+        for model_version, records in by_version.items():
+            image_arrays, true_labels, probabilities, _, image_hashes = zip(*records)
+            # Hashes are given either for every record (dedupe mode) or for none
+            if any(image_hash is None for image_hash in image_hashes):
+                image_hashes = None
+            else:
+                image_hashes = list(image_hashes)
+            BATCH_SIZE.labels('db_write').observe(len(records))
+            try:
+                with stage_timer('db_batch_insert'):
+                    insert_inputs_and_predictions_batch(
+                        self.conn,
+                        list(image_arrays),
+                        list(true_labels),
+                        list(probabilities),
+                        model_version=model_version,
+                        image_hashes=image_hashes
+                    )
+            except Exception as e:
+                logger.error("write-behind flush failed records=%d error=%s", len(records), e)
+                self._increment('failed', len(records))
+                continue
+            self._increment('written', len(records))
+            self._increment('batches')
+
+    def _run(self):
+        """Worker loop: collect a batch, write it, repeat until closed."""
+        stop = False
+        while not stop:
+            record = self._queue.get()
+            if record is None:
+                break
+            batch, stop = self._collect_batch(record)
+            self._flush(batch)
+
+        # Drain anything submitted concurrently with close()
+        remaining = []
+        while True:
+            try:
+                record = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if record is not None:
+                remaining.append(record)
+        for start in range(0, len(remaining), self.batch_size):
+            self._flush(remaining[start:start + self.batch_size])
@@ -0,0 +1,43 @@
+"""
+Generate the reference fixture for tests/test_numpy_inference.py.
+
+Builds create_model(extra_layer=True) with a fixed seed, exports its
+weights with model_io.export_numpy_weights() and stores Keras's own
+predictions for a batch of random images next to them, so the NumPy
+forward pass can be checked without TensorFlow installed.
+
+Usage (from the repository root, needs TensorFlow):
+    python -m tests.fixtures.make_numpy_reference
+"""
+import os
+
+import numpy as np
+from tensorflow import keras
+
+from src.create_model import create_model
+from src.model_io import export_numpy_weights
+
+FIXTURE_DIR = os.path.dirname(os.path.abspath(__file__))
+WEIGHTS_PATH = os.path.join(FIXTURE_DIR, 'numpy_reference_model.npz')
+OUTPUTS_PATH = os.path.join(FIXTURE_DIR, 'numpy_reference_outputs.npz')
+
+
+def main():
+    """Write the reference weights and Keras outputs."""
+    keras.utils.set_random_seed(0)
+    model = create_model(extra_layer=True)
+    inputs = np.random.default_rng(0).random((16, 28, 28, 1), dtype=np.float32)
+
+    # Logits are the input of the softmax output layer
+    output_layer = model.layers[-1]
+    hidden = keras.Model(model.inputs[0], output_layer.input)(inputs)
+    logits = np.asarray(hidden @ output_layer.kernel + output_layer.bias)
+    probabilities = model.predict(inputs, verbose=0)
+
+    export_numpy_weights(model, WEIGHTS_PATH)
+    np.savez(OUTPUTS_PATH, inputs=inputs, logits=logits, probabilities=probabilities)
+    print(f"Reference outputs written to {OUTPUTS_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Checks the memory-mappable weights export.
+
+The exported model is rebuilt from the reference fixture in tests/fixtures,
+so these tests run without TensorFlow.
+
+Usage:
+    python -m pytest tests/test_model_io.py
+"""
+import json
+import os
+
+import numpy as np
+
+from src.model_io import export_mmap_weights
+from src.numpy_inference import _load_npz, load_numpy_model
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+class FakeLayer:
+    """The parts of a Keras layer that the exports read."""
+
+    def __init__(self, config, weights):
+        self.name = config['config']['name']
+        self._config = config['config']
+        self._weights = weights
+
+    def get_config(self):
+        return self._config
+
+    def get_weights(self):
+        return self._weights
+
+
+class FakeModel:
+    """Stand-in for a Keras model holding the reference fixture's layers."""
+
+    def __init__(self, layer_configs, weights):
+        # The exports record each layer's class name, e.g. 'Conv2D'
+        self.layers = [
+            type(config['class_name'], (FakeLayer,), {})(config, weights.get(config['config']['name'], []))
+            for config in layer_configs
+        ]
+
+
+def load_reference_model(drop_layers=()):
+    """Build a FakeModel from the reference fixture, optionally without some layers."""
+    layer_configs, weights = _load_npz(os.path.join(FIXTURE_DIR, 'numpy_reference_model.npz'))
+    layer_configs = [config for config in layer_configs if config['config']['name'] not in drop_layers]
+    return FakeModel(layer_configs, weights)
+
+
+def test_export_round_trips(tmp_path):
+    directory = export_mmap_weights(load_reference_model(), str(tmp_path / 'model.weights'))
+    with np.load(os.path.join(FIXTURE_DIR, 'numpy_reference_outputs.npz')) as reference:
+        probabilities = load_numpy_model(directory).predict(reference['inputs'])
+        np.testing.assert_allclose(probabilities, reference['probabilities'], atol=1e-5)
+
+
+def test_export_replaces_previous_files(tmp_path):
+    model = load_reference_model()
+    hidden_dense = [layer.name for layer in model.layers if type(layer).__name__ == 'Dense'][0]
+    directory = str(tmp_path / 'model.weights')
+
+    export_mmap_weights(model, directory)
+    export_mmap_weights(load_reference_model(drop_layers=(hidden_dense,)), directory)
+
+    with open(os.path.join(directory, 'config.json')) as f:
+        names = [layer['config']['name'] for layer in json.load(f)]
+    assert hidden_dense not in names
+    assert not [name for name in os.listdir(directory) if name.startswith(f"{hidden_dense}.")]
+    assert sorted(os.listdir(tmp_path)) == ['model.weights']
@@ -0,0 +1,40 @@
+"""
+Checks the NumPy inference engine against Keras.
+
+The fixtures in tests/fixtures hold the weights of a create_model() network
+and the outputs Keras computed for them (see make_numpy_reference.py), so
+these tests run without TensorFlow.
+
+Usage:
+    python -m pytest tests/test_numpy_inference.py
+"""
+import os
+
+import numpy as np
+
+from src.numpy_inference import load_numpy_model
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def load_reference():
+    """Load the reference model and the Keras outputs for its inputs."""
+    model = load_numpy_model(os.path.join(FIXTURE_DIR, 'numpy_reference_model.npz'))
+    with np.load(os.path.join(FIXTURE_DIR, 'numpy_reference_outputs.npz')) as outputs:
+        return model, dict(outputs)
+
+
+def test_probabilities_match_keras():
+    model, reference = load_reference()
+    probabilities = model.predict(reference['inputs'])
+    np.testing.assert_allclose(probabilities, reference['probabilities'], atol=1e-5)
+
+
+def test_logits_match_keras():
+    model, reference = load_reference()
+    x = reference['inputs']
+    for layer in model.layers[:-1]:
+        x = layer(x)
+    output_layer = model.layers[-1]
+    logits = x @ output_layer.kernel + output_layer.bias
+    np.testing.assert_allclose(logits, reference['logits'], atol=1e-5)